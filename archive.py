@@ -0,0 +1,125 @@
+# Reading files inside archives for pangloss.
+#
+# members() opens tar files (compressed or not), zip files (such as jars)
+# and gzipped files and yields the text files in them one after another,
+# as file objects that read straight from the archive, so nothing is
+# extracted to disk. Archives found inside archives are opened in turn,
+# up to a given depth. Members are named archive!member, or
+# archive!inner!member for nested archives.
+#
+# Tar and gzip files are read strictly in order. Zip files need random
+# access, so a zip file inside another archive is read into memory
+# first.
+
+import io
+import os
+import sys
+import gzip
+import lzma
+import zlib
+import tarfile
+import zipfile
+
+import scan
+
+tarSuffixes = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+zipSuffixes = (".zip", ".jar", ".war", ".ear")
+gzipSuffixes = (".gz",)
+
+# Levels of archives opened, counting the outermost one.
+defaultDepth = 3
+
+# What a broken archive raises.
+errors = (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError, zipfile.LargeZipFile,
+          zlib.error, lzma.LZMAError)
+
+# What a zip or gzip member that cannot be read raises: on opening, if it
+# is encrypted or compressed in a way zipfile does not support, and on
+# reading, if its compressed data is corrupt. Such members are skipped.
+memberErrors = (RuntimeError, NotImplementedError, zipfile.BadZipFile, EOFError,
+                zlib.error, lzma.LZMAError)
+
+def kind(name):
+    """Return "tar", "zip" or "gzip" if name is that of an archive, else None."""
+    lower = name.lower()
+    if lower.endswith(tarSuffixes):
+        return "tar"
+    if lower.endswith(zipSuffixes):
+        return "zip"
+    if lower.endswith(gzipSuffixes):
+        return "gzip"
+    return None
+
+class Member(object):
+    """A file in an archive, read through once: its first bytes, then the rest."""
+
+    def __init__(self, name, head, fileobj):
+        self.name = name
+        self.head = head
+        self.fileobj = fileobj
+
+    def read(self, size=-1):
+        if not self.head:
+            return self.fileobj.read(size)
+        if size is None or size < 0:
+            data = self.head + self.fileobj.read()
+        else:
+            data = self.head[:size]
+        self.head = self.head[len(data):]
+        return data
+
+    def seekable(self):
+        return False
+
+def members(fileobj, name, depth=defaultDepth):
+    """Yield a (name, Member, size) triple for each text file in an archive.
+
+    fileobj is the archive (seekable, for a zip file) and name its name,
+    which tells its kind; size is None where the archive does not tell
+    it. Each Member can only be read until the next one is yielded.
+    Raises one of errors if the archive is broken; members that cannot
+    be read here are reported on stderr and skipped. Reading a Member
+    may raise one of memberErrors, which callers should pass to
+    skipped() and carry on with the next member.
+    """
+    archiveKind = kind(name)
+    if archiveKind == "tar":
+        with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+            for info in tar:
+                if info.isfile():
+                    yield from entry(tar.extractfile(info), name + "!" + info.name, info.size, depth)
+    elif archiveKind == "zip":
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                member = name + "!" + info.filename
+                try:
+                    with archive.open(info) as f:
+                        yield from entry(f, member, info.file_size, depth)
+                except memberErrors as e:
+                    skipped(member, e)
+    elif archiveKind == "gzip":
+        member = name + "!" + os.path.basename(name.split("!")[-1])[:-3]
+        with gzip.GzipFile(fileobj=fileobj) as f:
+            try:
+                yield from entry(f, member, None, depth)
+            except memberErrors as e:
+                skipped(member, e)
+
+def skipped(name, error):
+    """Report on stderr that the member name was skipped because of error."""
+    print("pangloss: " + name + ": " + (str(error) or type(error).__name__), file=sys.stderr)
+
+def entry(fileobj, name, size, depth):
+    """Yield fileobj as a member, or its own members if it is an archive."""
+    if kind(name) is not None:
+        if depth > 1:
+            if kind(name) == "zip":
+                fileobj = io.BytesIO(fileobj.read())
+            yield from members(fileobj, name, depth - 1)
+        return
+    # Skip binary files, as scan.walk() does.
+    head = fileobj.read(scan.sniffSize)
+    if head and b"\0" not in head:
+        yield name, Member(name, head, fileobj), size
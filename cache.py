@@ -0,0 +1,218 @@
+# Persistent result cache for pangloss.
+#
+# Scores are stored in an SQLite database, keyed by the content of the
+# files they were computed for: the key is the file's git blob id (the
+# SHA-1 of "blob <size>\0" followed by the contents), so identical files
+# anywhere are only classified once, and git objects can be looked up
+# without reading them. Scores are stored without the extension prior,
+# which is applied on every lookup. Blobs found to be binary by a git
+# history are stored with no scores, so that they are not read again.
+#
+# A second table remembers the blob id of each path along with its size,
+# modification time and inode, so unchanged files are found without
+# being read at all.
+#
+# The database is tied to the fingerprint of the model (and extension
+# prior) that filled it, and is emptied when that changes. Entries are
+# evicted least recently used first once there are more than maxEntries
+# blobs or paths. Lookups may run in any number of processes; all writes
+# go through the one Cache that created the database.
+
+import io
+import os
+import sqlite3
+import hashlib
+
+import numpy
+
+defaultDirectory = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pangloss")
+
+# Each entry takes a little over 200 bytes, plus the length of its path.
+defaultEntries = 1000000
+
+# Writes are committed in batches of this many.
+commitInterval = 1000
+
+# New files up to this size are read into memory whole, so that their
+# blob id is known before they are classified; larger ones are hashed as
+# they are classified. Either way they are read once.
+wholeSize = 1 << 22
+
+def blob_digest(size):
+    """Return a SHA-1 digest fed the git blob header for size bytes of contents."""
+    return hashlib.sha1(b"blob " + str(size).encode() + b"\0")
+
+class Hashing(object):
+    """A file object that feeds everything read from it to a digest."""
+
+    def __init__(self, fileobj, digest):
+        self.fileobj = fileobj
+        self.digest = digest
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.digest.update(data)
+        return data
+
+class Cache(object):
+    """Classification results stored on disk, keyed by file content."""
+
+    def __init__(self, fingerprint, directory=None, maxEntries=defaultEntries, writer=True):
+        """Open (or create) the cache in directory for the given model fingerprint.
+
+        With writer false, the cache must exist already; it is only used
+        through probe(), as worker processes do.
+        """
+        self.directory = directory or defaultDirectory
+        self.maxEntries = maxEntries
+        self.statHits = 0
+        self.hashHits = 0
+        self.misses = 0
+        self.pending = 0
+        if writer and not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        self.db = sqlite3.connect(os.path.join(self.directory, "results.sqlite"), timeout=60)
+        if not writer:
+            return
+
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS blobs (hash BLOB PRIMARY KEY, scores BLOB, consumed INTEGER, used INTEGER);
+            CREATE TABLE IF NOT EXISTS paths (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER,
+                                              inode INTEGER, hash BLOB, used INTEGER);
+            CREATE INDEX IF NOT EXISTS blobs_used ON blobs (used);
+            CREATE INDEX IF NOT EXISTS paths_used ON paths (used);
+        """)
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row is None or row[0] != fingerprint:
+            self.db.execute("DELETE FROM blobs")
+            self.db.execute("DELETE FROM paths")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+        self.db.commit()
+        self.blobs = self.db.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        self.paths = self.db.execute("SELECT COUNT(*) FROM paths").fetchone()[0]
+        self.clock = self.db.execute("SELECT MAX(used) FROM blobs").fetchone()[0] or 0
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def get(self, hash):
+        """Return the (scores, bytes read) stored for a blob id, or None."""
+        row = self.db.execute("SELECT scores, consumed FROM blobs WHERE hash = ?", (hash,)).fetchone()
+        if row is None:
+            return None
+        return numpy.frombuffer(row[0]), row[1]
+
+    def lookup(self, hash):
+        """Return get(hash), counting a hit or a miss and marking the blob used."""
+        found = self.get(hash)
+        if found is None:
+            self.misses += 1
+            return None
+        self.hashHits += 1
+        self.clock += 1
+        self.db.execute("UPDATE blobs SET used = ? WHERE hash = ?", (self.clock, hash))
+        self.committed()
+        return found
+
+    def put(self, hash, scores, consumed):
+        """Store the scores (without the extension prior) and bytes read for a blob id."""
+        self.clock += 1
+        self.blobs += 1
+        self.db.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?)",
+                        (hash, numpy.asarray(scores, dtype=float).tobytes(), consumed, self.clock))
+        self.evict()
+        self.committed()
+
+    def put_binary(self, hash):
+        """Store that a blob id is binary, which get() then returns as no scores."""
+        self.put(hash, (), 0)
+
+    def committed(self):
+        """Commit once commitInterval writes are pending."""
+        self.pending += 1
+        if self.pending >= commitInterval:
+            self.db.commit()
+            self.pending = 0
+
+    def probe(self, classifier, path):
+        """Find or compute the scores of the file at path.
+
+        Returns a tuple to be passed to record(): how the scores were
+        found ("stat", "hash" or "miss", or "binary" for contents a git
+        history stored as binary, which are classified but not stored),
+        the path's stat key, its blob id, its scores without the extension
+        prior and the bytes read.
+        """
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns, st.st_ino)
+        row = self.db.execute("SELECT blobs.hash, scores, consumed FROM paths JOIN blobs USING (hash) "
+                              "WHERE path = ? AND size = ? AND mtime = ? AND inode = ?", (path,) + key).fetchone()
+        if row is not None:
+            return "stat", key, row[0], numpy.frombuffer(row[1]), row[2]
+        digest = blob_digest(st.st_size)
+        with open(path, 'rb') as f:
+            if st.st_size <= wholeSize:
+                data = f.read()
+                digest.update(data)
+                hash = digest.digest()
+                found = self.get(hash)
+                if found is not None and len(found[0]):
+                    return ("hash", key, hash) + found
+                scores = classifier.read_scores(io.BytesIO(data))
+            else:
+                scores = classifier.read_scores(Hashing(f, digest))
+                hash = digest.digest()
+                found = self.get(hash)
+                if found is not None and len(found[0]):
+                    return ("hash", key, hash) + found
+        return ("miss" if found is None else "binary", key, hash) + scores
+
+    def record(self, path, probe):
+        """Store what probe() found for path; return its scores and bytes read."""
+        kind, key, hash, scores, consumed = probe
+        if kind == "binary":
+            self.misses += 1
+            return scores, consumed
+        if kind == "miss":
+            self.misses += 1
+            self.put(hash, scores, consumed)
+        self.clock += 1
+        if kind == "stat":
+            self.statHits += 1
+        else:
+            if kind == "hash":
+                self.hashHits += 1
+            self.paths += 1
+            self.db.execute("INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?, ?, ?)",
+                            (path,) + key + (hash, self.clock))
+        if kind != "miss":
+            self.db.execute("UPDATE blobs SET used = ? WHERE hash = ?", (self.clock, hash))
+            self.db.execute("UPDATE paths SET used = ? WHERE path = ?", (self.clock, path))
+        self.evict()
+        self.committed()
+        return scores, consumed
+
+    def evict(self):
+        """Drop the least recently used tenth once a table is over maxEntries."""
+        for table in ("blobs", "paths"):
+            if getattr(self, table) <= self.maxEntries:
+                continue
+            # The running count includes replaced rows; get the real one.
+            count = self.db.execute("SELECT COUNT(*) FROM " + table).fetchone()[0]
+            if count > self.maxEntries:
+                self.db.execute("DELETE FROM " + table + " WHERE rowid IN "
+                                "(SELECT rowid FROM " + table + " ORDER BY used LIMIT ?)",
+                                (count - self.maxEntries * 9 // 10,))
+                count = self.db.execute("SELECT COUNT(*) FROM " + table).fetchone()[0]
+            setattr(self, table, count)
+
+    def statistics(self):
+        """Return a one-line summary of hits and misses so far."""
+        total = self.statHits + self.hashHits + self.misses
+        rate = 100.0 * (self.statHits + self.hashHits) / total if total else 0.0
+        return ("cache: %d unchanged paths, %d known contents, %d misses (%.1f%% hits), %d entries"
+                % (self.statHits, self.hashHits, self.misses, rate, self.blobs))
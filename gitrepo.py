@@ -0,0 +1,115 @@
+# Classifying the files of git commits for pangloss.
+#
+# history() goes through commits without checking them out: git ls-tree
+# lists the blobs of each commit's tree, and one long-lived git cat-file
+# --batch process reads their contents. Each distinct blob is classified
+# only once: its scores are remembered by blob id for the whole run and,
+# with a cache.Cache, across runs too, so going through many commits
+# costs little more than classifying the blobs that changed.
+
+import io
+import os
+import subprocess
+
+import scan
+
+def git(repository, *args):
+    """Run git with args in repository; return its output."""
+    return subprocess.check_output(["git", "-C", repository] + list(args))
+
+def commits(repository, revisions):
+    """Return the ids of the commits revisions name, A..B ranges oldest first."""
+    ids = []
+    for revision in revisions:
+        if ".." in revision:
+            ids.extend(git(repository, "rev-list", "--reverse", revision).decode().split())
+        else:
+            ids.append(git(repository, "rev-parse", "--verify", "--quiet", revision + "^{commit}").decode().strip())
+    return ids
+
+def blobs(repository, commit, vendored=False):
+    """Yield (path, blob id, size) for the non-empty files in the tree of commit.
+
+    Symbolic links, submodules and version control files are left out,
+    and so are vendored files unless vendored is true, as in scan.walk().
+    """
+    for record in git(repository, "ls-tree", "-r", "-l", "-z", "--full-tree", commit).split(b"\0"):
+        if not record:
+            continue
+        info, path = record.split(b"\t", 1)
+        mode, kind, id, size = info.split()
+        if kind != b"blob" or mode == b"120000" or size == b"0":
+            continue
+        path = os.fsdecode(path)
+        directories = path.split("/")
+        name = directories.pop()
+        if name in scan.controlFiles:
+            continue
+        if not vendored and (scan.vendoredFiles.search(name) or
+                             any(directory in scan.vendoredDirectories for directory in directories)):
+            continue
+        yield path, id.decode(), int(size)
+
+class CatFile(object):
+    """A git cat-file --batch process reading the objects of one repository."""
+
+    def __init__(self, repository):
+        self.process = subprocess.Popen(["git", "-C", repository, "cat-file", "--batch"],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+    def read(self, id):
+        """Return the contents of the object id, or None if it is missing."""
+        self.process.stdin.write(id.encode() + b"\n")
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        data = self.process.stdout.read(int(header[2]))
+        self.process.stdout.read(1)
+        return data
+
+def score(classifier, objects, id, cache=None):
+    """Return the (scores, bytes read) of blob id, or None if it is binary.
+
+    With a cache.Cache, binary blobs are remembered there too, so they
+    are not read again either.
+    """
+    hash = bytes.fromhex(id)
+    if cache is not None:
+        found = cache.lookup(hash)
+        if found is not None:
+            return found if len(found[0]) else None
+    data = objects.read(id)
+    if not data or b"\0" in data[:scan.sniffSize]:
+        if data and cache is not None:
+            cache.put_binary(hash)
+        return None
+    found = classifier.read_scores(io.BytesIO(data))
+    if cache is not None:
+        cache.put(hash, *found)
+    return found
+
+def history(classifier, repository, revisions, cache=None, vendored=False):
+    """Yield (commit id, language -> [bytes, files]) for each commit revisions name."""
+    known = {}
+    objects = CatFile(repository)
+    try:
+        for commit in commits(repository, revisions):
+            totals = {}
+            for path, id, size in blobs(repository, commit, vendored):
+                if id not in known:
+                    known[id] = score(classifier, objects, id, cache)
+                if known[id] is None:
+                    continue
+                scores, consumed = known[id]
+                language = classifier.result(scores / classifier.prior(os.path.splitext(path)[1]), consumed).language
+                total = totals.setdefault(language, [0, 0])
+                total[0] += size
+                total[1] += 1
+            yield commit, totals
+    finally:
+        objects.close()
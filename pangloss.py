@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 
 # pangloss
 # Language detector for files.
@@ -10,148 +10,1599 @@
 #
 # Usage:
 #   pangloss filename.ext
-
-# Currently supports the following languages:
-
-classes = ["C++", "JavaScript", "Java", "C", "Ruby", "Perl", "TypeScript", "Python", "Scala", "PHP", "Objective-C"]
-
-# Each extension corresponds to the classifier above.
-# We incorporate extension info as a weak prior, below.
-extensions = [[".cpp", ".hpp", ".hh", ".cc", ".cxx", ".hxx", ".C"],
-              [".js"],
-              [".java"],
-              [".c",".h"],
-              [".rb"],
-              [".pl",".pm"],
-              [".ts"],
-              [".py"],
-              [".scala"],
-              [".php"],
-              [".m"]]
+#
+# or, as a library:
+#
+#   import pangloss
+#   classifier = pangloss.Classifier()
+#   result = classifier.classify_path("filename.ext")
+#   print(result.language, result.confidence)
+#
+# The language models themselves are in models.py.
 
 extensionPrior = 1.1 # 10% more likely if it has the given suffix
 
 import os
 import sys
 import csv
+import collections
+import functools
+import hashlib
+import io
+import itertools
+import json
 import math
+import mmap
+import multiprocessing
+import struct
+import subprocess
+import zlib
+
+import numpy
 
 def help():
-    print "pangloss determines the programming language a file is written in."
-    print "Usage: pangloss { filename [--ext=XYZ] }"
+    print("pangloss determines the programming language a file is written in.")
+    print("Usage: pangloss { filename [--ext=XYZ] }")
     print("       The --ext argument can override the physical extension of the file")
     print("Alternatively, pangloss can run in a batch mode, where --batch=XYZ argument")
     print("contains list of files, possibly followed by their extension hints")
+    print("       --jobs=N classifies files on N processes (0 for one per core);")
+    print("       add --ordered to print results in input order")
+    print("       --stream reads files in chunks and stops once the best language leads")
+    print("       by --margin=NATS (default 100) or after --max-bytes=N bytes; the")
+    print("       number of bytes read is printed after the confidence")
+    print("       --sample[=K] reads only K (default 16) evenly spaced windows of")
+    print("       --window=BYTES (default 65536) from each file; the bytes read and the")
+    print("       fraction of the file they make up are printed after the confidence")
+    print("       --stdin reads the filenames from standard input, one per line, or")
+    print("       separated by NULs with -0 (as from find -print0); files are then read")
+    print("       ahead on threads while others are classified, holding at most")
+    print("       --read-ahead=BYTES (default 64 MB) at once, which also turns on")
+    print("       reading ahead for other inputs; with one job only")
+    print("Filenames may be directories, which are scanned recursively on all cores,")
+    print("       honoring .gitignore files and --exclude=PATTERN options and skipping")
+    print("       binary and (unless --vendored) vendored files")
+    print("       --summary prints the share of each language in bytes at the end")
+    print("Filenames may be .tar (possibly compressed), .zip, .jar or .gz archives, whose")
+    print("       files are classified as archive!member without extracting them,")
+    print("       opening archives inside archives up to --archive-depth=N (default 3)")
+    print("       --cache[=DIR] keeps results in DIR (default ~/.cache/pangloss) and reuses")
+    print("       them for unchanged or identical files; --cache-size=N bounds it to N")
+    print("       entries and --cache-stats reports hits and misses")
+    print("       --cascade decides by byte histograms where they are clear, reading the")
+    print("       words of the other files only (needs a model from train.py), and")
+    print("       reports how many files each stage decided")
+    print("       --regions[=WORDS] splits each file into regions of lines in one language")
+    print("       and prints filename,first-last,language,confidence for each; the")
+    print("       language of a line is that of the WORDS (default 100) words around it")
+    print("       (not with --output)")
+    print("       --shard=I/N classifies only the files whose path falls in shard I of N")
+    print("       (counting from 0) by its hash, so that N machines given the same")
+    print("       arguments split the work; --output=FILE appends the results to FILE")
+    print("       instead, each followed by the size of its file, skipping the files")
+    print("       already in it, to resume a shard that stopped")
+    print("       --stats prints where the time went, phase by phase, at the end;")
+    print("       --trace=FILE writes the times and word counts of each file to FILE")
+    print("       as JSON lines")
+    print("Usage: pangloss --merge [--summary] { FILE }")
+    print("       prints the results in the output FILEs of shards, by filename, and")
+    print("       with --summary, the share of each language in bytes")
+    print("Usage: pangloss --git=REPOSITORY { revision | A..B }")
+    print("       prints commit,language,bytes,files for each commit (HEAD by default)")
+    print("       without checking it out, classifying each distinct file content once")
+    print("       (and with --cache, once across runs)")
+    print("       --model=FILE classifies with a compiled model instead of models.py;")
+    print("       --compile-model[=FILE] compiles models.py (to pangloss.model by default)")
+    print("       --hashed[=BITS] hashes the words of the model into --buckets=N (default")
+    print("       1048576, a power of two) buckets and quantizes its log-probabilities to")
+    print("       BITS (8, the default, or 16) bits, making it several times smaller;")
+    print("       with --compile-model, the hashed model is written out")
+    print("       --learn=LANGUAGE folds the words of the files given into the model")
+    print("       (--model=FILE, or pangloss.model) as written in LANGUAGE, and writes it")
+    print("       back, keeping the most frequent words of each language, as many as it")
+    print("       had and at least --learn-words=N (default 100); --learn-weight=W counts")
+    print("       each file W times (default 1), which it takes to outweigh the corpus")
     sys.exit(1)
 
-input = []
-if (len(sys.argv) < 2):
-    help();
-if (sys.argv[1].startswith("--batch=")):
-    # batch mode
-    if (len(sys.argv) > 2):
-        help()
-    with open(sys.argv[1][8:]) as f:
-        for line in f:
-            x = line.split(",")
-            if (len(x) == 1):
-                len.append(os.path.splitext(x[0])[1])
-            input.append((x[0], x[1]))
-else:
-    i = 1
-    while (i < len(sys.argv)):
-        fname = sys.argv[i]
-        i += 1
-        if (i < len(sys.argv) and sys.argv[i].startswith("--ext=")):
-            ext = sys.argv[i][6:]
-            i += 1
+def chunks(fileobj, size=65536, budget=None, stats=None, longest=None):
+    """Yield the words of fileobj a chunk at a time, with the bytes read so far.
+
+    A word cut by the end of a chunk is held back for the next one. Once
+    a word held back is longer than longest, if given, it cannot be one
+    the classifier knows: only its first longest + 1 bytes are yielded,
+    and the rest of it is skipped as it is read, so that a file without
+    whitespace (minified or base64 text) takes constant memory and linear
+    time. At most budget bytes are read, if given. Reading and splitting
+    are timed in stats, a stats.Stats, if given.
+    """
+    rest = b""
+    skipping = False
+    consumed = 0
+    while budget is None or consumed < budget:
+        if stats is not None:
+            stats.start()
+        data = fileobj.read(size if budget is None else min(size, budget - consumed))
+        if stats is not None:
+            stats.stop("read")
+        if not data:
+            break
+        consumed += len(data)
+        if stats is not None:
+            stats.start()
+        if skipping and not data[:1].isspace():
+            # Still in the overlong word: drop it up to the next whitespace.
+            split = data.split(None, 1)
+            skipping = len(split) == 1 and not data[-1:].isspace()
+            data = split[1] if len(split) == 2 else b""
         else:
-            ext = os.path.splitext(fname)[1]
-        input.append((fname, ext))    
-            
-def words(fileobj):
-    for line in fileobj:
-        for word in line.split():
-            yield word
+            skipping = False
+        chunk = (rest + data).split()
+        rest = b"" if data[-1:].isspace() or not chunk else chunk.pop()
+        if longest is not None and len(rest) > longest:
+            chunk.append(rest[:longest + 1])
+            rest = b""
+            skipping = True
+        if stats is not None:
+            stats.stop("split")
+        yield chunk, consumed
+    if rest:
+        yield [rest], consumed
+
+# Files that are read to the end are read in chunks of this many bytes.
+readSize = 1 << 18
 
-objc = { '=' : 32651 ,  '{' : 29226 ,  '}' : 29057 ,  'if' : 16587 ,  '*' : 14653 ,  '==' : 10984 ,  'return' : 9412 ,  '-' : 8849 ,  '*/' : 7050 ,  '/*' : 5022 ,  '[self' : 4759 ,  'of' : 4623 ,  'else' : 4471 ,  '!=' : 3900 ,  'for' : 3665 ,  '//' : 3092 ,  '#import' : 2980 ,  '0)' : 2974 ,  '0;' : 2901 ,  '(void)' : 2879 ,  '&&' : 2856 ,  'in' : 2699 ,  '+' : 2679 ,  'NSString' : 2527 ,  'nil;' : 2468 ,  'nil)' : 2287 ,  '/**' : 2055 ,  'int' : 2017 ,  'unsigned' : 2012 ,  'static' : 1965 ,  'case' : 1930 ,  '<' : 1814 ,  '>' : 1795 ,  'NO;' : 1699 ,  'with' : 1663 ,  '(id)' : 1658 ,  'while' : 1603 ,  '#endif' : 1599 ,  'this' : 1523 ,  'char' : 1485 ,  'break;' : 1464 ,  'not' : 1412 ,  'as' : 1336 ,  'YES;' : 1327 ,  'alloc]' : 1311 ,  'This' : 1301 ,  '@end' : 1264 ,  '||' : 1251 ,  'or' : 1214 ,  '0' : 1200 ,  ':' : 1175 ,  '#if' : 1161 ,  'c' : 1124 ,  'const' : 1091 ,  'nil' : 1090 ,  'isEqual:' : 1086 ,  '#define' : 1075 ,  'length:' : 1062 ,  'YES)' : 1059 ,  'void' : 1058 ,  'BOOL' : 1029 ,  'id' : 999 ,  'forKey:' : 919 ,  'format:' : 917 ,  'data' : 913 ,  'have' : 882 ,  'raise:' : 876 ,  'on' : 871 ,  'file' : 870 ,  'i' : 846 ,  'new];' : 831 ,  'If' : 822 ,  'NO)' : 809 ,  '#include' : 802 ,  '*)' : 795 ,  '...' : 788 ,  'return;' : 782 ,  '1' : 771 ,  'method' : 750 ,  '/>' : 747 ,  '(BOOL)' : 743 ,  'string' : 738 ,  '[s' : 737 ,  '0,' : 732 }
+# Probability assigned to words a classifier has never seen.
+smoothing = 0.0001
 
-php = { '=' : 941422 ,  '{' : 765160 ,  '=>' : 763594 ,  '}' : 762186 ,  'function' : 345522 ,  'public' : 290964 ,  'if' : 259775 ,  'return' : 222685 ,  'new' : 130823 ,  '.' : 123430 ,  'use' : 101998 ,  ');' : 80648 ,  'array(' : 71631 ,  '<?php' : 62340 ,  '),' : 60995 ,  'as' : 60582 ,  'class' : 57626 ,  'else' : 50966 ,  "'0'," : 50585 ,  'foreach' : 42805 ,  '&&' : 42508 ,  'extends' : 42496 ,  'print' : 42073 ,  '[' : 41022 ,  'private' : 40432 ,  "''," : 37404 ,  '==' : 35880 ,  '===' : 34708 ,  'null,' : 33399 ,  ')' : 32729 ,  'array' : 32018 ,  'throw' : 29855 ,  "'id'" : 28604 ,  "'," : 28457 ,  "'1'," : 28078 ,  'array();' : 28040 ,  'case' : 27443 ,  "'" : 26779 ,  '(' : 25320 ,  ':' : 25197 ,  'false;' : 24819 ,  '.=' : 24629 ,  'const' : 24575 ,  '?' : 23339 ,  '||' : 22741 ,  '0,' : 22121 ,  '[],' : 21662 ,  'true,' : 21202 ,  '],' : 20200 ,  'break;' : 19983 ,  'true;' : 19853 ,  '!==' : 19801 ,  'null)' : 19613 ,  'not' : 18855 ,  '0;' : 18660 ,  'null;' : 18267 ,  'static' : 18198 ,  '"' : 17364 ,  '-' : 17316 ,  'false,' : 16309 ,  '0)' : 15346 ,  '+' : 15225 ,  'for' : 14920 ,  '$this;' : 14082 ,  '1,' : 13992 ,  '>' : 13971 ,  "'';" : 13959 ,  'echo' : 13573 ,  '<' : 13100 ,  '$result' : 12622 ,  'global' : 12038 ,  '$sql.=' : 11874 ,  'false);' : 11788 ,  '!=' : 11631 ,  'in' : 11494 ,  '];' : 11216 ,  'AND' : 11149 ,  'of' : 11131 ,  '(!' : 10921 ,  'elseif' : 10771 ,  '*' : 10723 ,  "'type'" : 10596 ,  '1;' : 10473 ,  "'16'," : 9385 ,  'array(),' : 9335 ,  'false)' : 9299 ,  ']' : 9116 ,  "'body'," : 8947 ,  '$data' : 8706 ,  '[];' : 8635 ,  '0' : 8465 ,  'catch' : 8097 ,  'false' : 7932 ,  "'187'," : 7913 }
+# Changed whenever the same model starts giving different scores, so that
+# results cached with the old scoring are dropped.
+scoringVersion = 3
+
+# A compiled model starts with a magic string, the format number, and the
+# lengths of the JSON header and of the newline-separated vocabulary that
+# follow it. Then comes one flat float64 array of log-probabilities per
+# class, starting at the next multiple of 8 bytes, and, if the header says
+# so, the log-probabilities of the 256 byte values for each class.
+#
+# A hashed model (see hash_model()) has no vocabulary. Its header says
+# how many buckets and bits it has, and the log-probabilities are
+# replaced by the uint32 numbers of the buckets that hold words, in
+# order, the float64 scale and offset of each class, and its quantized
+# values.
+#
+# Since format 2, the header may say that the raw counts follow: the
+# float64 count of each vocabulary word per class, the total of each
+# class, and, with byte log-probabilities, the count of each byte value
+# per class. Format 1 models, which lack them, still load.
+modelMagic = b"PANGLOSS"
+modelFormat = 2
+modelFormats = (1, 2)
+modelPrefix = struct.Struct("<8sIII")
 
+# Used, when present and newer than models.py, instead of models.py.
+defaultModel = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pangloss.model")
 
-python = { '=' : 127029 ,  '#' : 75374 ,  'def' : 39952 ,  'the' : 37945 ,  'if' : 32369 ,  'in' : 22803 ,  'return' : 20984 ,  'a' : 20375 ,  'is' : 19248 ,  'for' : 18792 ,  'to' : 17378 ,  '->' : 16634 ,  'of' : 13981 ,  'and' : 13727 ,  'not' : 12204 ,  'import' : 11129 ,  'class' : 10772 ,  'LETTER' : 10544 ,  '+' : 10253 ,  '==' : 10017 ,  "'" : 9692 ,  'LATIN' : 7854 ,  'from' : 7832 ,  '"""' : 7749 ,  'with' : 7340 ,  'be' : 7093 ,  'else:' : 6495 ,  'or' : 6469 ,  '%' : 6417 ,  'None,' : 6384 ,  '1' : 6244 ,  'as' : 6021 ,  ':' : 5902 ,  'that' : 5860 ,  'try:' : 5660 ,  'SMALL' : 5169 ,  'raise' : 5036 ,  'print' : 4991 ,  '-' : 4809 ,  'CAPITAL' : 4679 ,  'pass' : 4628 ,  'this' : 4487 ,  'None' : 4392 ,  'except' : 4289 ,  '0' : 4265 ,  'an' : 4237 ,  'are' : 4200 ,  '>>>' : 3819 ,  'The' : 3798 ,  'it' : 3781 ,  'by' : 3751 ,  'WITH' : 3750 ,  'file' : 3560 ,  'on' : 3404 ,  'name' : 3375 ,  '*' : 3287 ,  'i' : 3142 ,  'x' : 2965 ,  'None:' : 2896 ,  '[]' : 2855 ,  'line' : 2841 ,  'elif' : 2808 ,  'which' : 2555 ,  's' : 2517 ,  'This' : 2507 ,  'test' : 2499 ,  '2' : 2392 ,  'value' : 2364 ,  'c' : 2350 ,  'will' : 2284 ,  'we' : 2272 ,  '"' : 2249 ,  '|' : 2246 ,  'b' : 2210 ,  'should' : 2208 ,  'If' : 2198 ,  '...' : 2189 ,  "'\\n'" : 2140 ,  'can' : 2139 ,  '>' : 2100 ,  '!=' : 2091 ,  '<' : 2076 ,  'all' : 2048 ,  'string' : 2045 ,  '0,' : 2041 ,  'data' : 2023 ,  '1,' : 2018 ,  'module' : 1982 ,  'result' : 1969 ,  '{' : 1924 ,  'list' : 1908 ,  'A' : 1854 ,  'while' : 1845 ,  'object' : 1830 ,  '0)' : 1824 ,  '1)' : 1820 ,  '}' : 1808 ,  'have' : 1788 ,  '\\' : 1727 ,  'when' : 1721 }
+# A model: the class names and extension lists, the vocabulary (word ->
+# column), the log-probabilities (one row per class and one column per
+# vocabulary word, plus a last column for words that are in no classifier
+# at all), a version string, and the log-probabilities of byte values
+# (one row of 256 per class), or None if they are not known for every
+# class.
+#
+# counts, if known, are the raw Counts the log-probabilities come from:
+# they let update() fold in new files without the corpus.
+#
+# In a hashed model, the vocabulary is the sorted array of the hash
+# buckets that hold words, column j being that of the j-th of them, and
+# the log-probabilities are Quantized: class i's log-probability of
+# column j is offsets[i] + scales[i] * values[i, j], and buckets is the
+# number of buckets words are hashed into.
+Model = collections.namedtuple("Model", ["classes", "extensions", "vocabulary", "logprobs", "version",
+                                         "bytelogprobs", "counts"], defaults=[None])
+Counts = collections.namedtuple("Counts", ["words", "totals", "bytes"])
+Quantized = collections.namedtuple("Quantized", ["values", "scales", "offsets", "buckets"])
 
-scala = { '=' : 187433 ,  '*' : 124068 ,  '{' : 112505 ,  '}' : 106920 ,  'val' : 81495 ,  'def' : 79992 ,  '=>' : 51929 ,  '//' : 51356 ,  'case' : 35328 ,  'of' : 31812 ,  '*/' : 31146 ,  'new' : 30808 ,  'if' : 28925 ,  'import' : 24915 ,  '/**' : 24412 ,  'for' : 22660 ,  'in' : 21795 ,  'with' : 20957 ,  '+' : 20565 ,  'this' : 20430 ,  'class' : 19228 ,  'extends' : 18429 ,  'override' : 15929 ,  '==' : 14181 ,  'else' : 13235 ,  '|' : 12933 ,  'object' : 12326 ,  'or' : 12106 ,  'Int' : 11192 ,  'not' : 10906 ,  'private' : 10787 ,  'under' : 10110 ,  'type' : 9215 ,  'file' : 9155 ,  '0' : 8628 ,  'var' : 8493 ,  '===' : 8462 ,  '"' : 8303 ,  'trait' : 8160 ,  '/*' : 8063 ,  'match' : 7772 ,  'Unit' : 7678 ,  '-' : 7563 ,  'on' : 7487 ,  'License' : 7369 ,  '::' : 7366 ,  '_' : 7058 ,  '@param' : 6800 ,  '&&' : 6774 ,  'package' : 6639 ,  'as' : 6616 ,  '1' : 6597 ,  '**' : 6342 ,  ';' : 6289 ,  '/' : 6246 ,  'may' : 6224 ,  'A' : 6192 ,  'See' : 5566 ,  '->' : 5153 ,  'should' : 5093 ,  'Int,' : 5052 ,  'You' : 5000 ,  'License.' : 4932 ,  'Apache' : 4915 ,  'value' : 4841 ,  'at' : 4791 ,  'x' : 4779 ,  'use' : 4706 ,  'Boolean' : 4696 ,  '+=' : 4688 ,  'one' : 4615 ,  'This' : 4591 ,  'String,' : 4418 ,  'null' : 4304 ,  'String' : 4204 ,  '!=' : 4201 ,  'all' : 4170 ,  'final' : 3906 ,  'more' : 3853 ,  '<-' : 3842 ,  '0)' : 3781 ,  '<' : 3754 ,  'Test' : 3708 ,  '1)' : 3675 ,  ')' : 3662 }
+# Fewest words learn() keeps per class.
+learnWords = 100
 
+# Default number of hash buckets (a power of two) and bits per value of
+# hashed models.
+defaultBuckets = 1 << 20
+defaultBits = 8
 
-javascript = { '=' : 97582 ,  '{' : 71715 ,  '}' : 42792 ,  'var' : 40475 ,  '*' : 36627 ,  'if' : 30302 ,  '//' : 29291 ,  'return' : 22334 ,  'function' : 21499 ,  'the' : 17250 ,  '+' : 14450 ,  '===' : 11115 ,  'to' : 10506 ,  '});' : 9570 ,  'a' : 8828 ,  '};' : 8479 ,  '&&' : 8176 ,  'new' : 7205 ,  'is' : 6891 ,  'of' : 6867 ,  '||' : 6692 ,  'else' : 6457 ,  'for' : 6451 ,  '},' : 6407 ,  '*/' : 6166 ,  ':' : 5310 ,  '@param' : 5013 ,  '/**' : 4877 ,  'The' : 4650 ,  'in' : 4594 ,  '})' : 4373 ,  'and' : 4365 ,  '0;' : 4290 ,  'i' : 4269 ,  '-' : 4245 ,  '<' : 4209 ,  '!==' : 4051 ,  '?' : 4020 ,  ',' : 3543 ,  'function()' : 3530 ,  'module.exports' : 3251 ,  '+=' : 3149 ,  'not' : 3115 ,  '()' : 3084 ,  'case' : 3009 ,  'const' : 3005 ,  'that' : 2973 ,  'be' : 2962 ,  "'use" : 2945 ,  "strict';" : 2860 ,  'false;' : 2770 ,  '@returns' : 2626 ,  "'" : 2622 ,  'throw' : 2524 ,  'with' : 2520 ,  'true;' : 2481 ,  'an' : 2445 ,  'value' : 2427 ,  'this' : 2408 ,  '0,' : 2383 ,  'node' : 2349 ,  'or' : 2318 ,  '=>' : 2130 ,  'true' : 2101 ,  '0)' : 2059 ,  '==' : 1971 ,  'as' : 1863 ,  '>' : 1819 ,  'it' : 1797 ,  '(var' : 1794 ,  'false' : 1776 ,  '[' : 1738 ,  'are' : 1717 ,  'on' : 1701 ,  'object' : 1684 ,  '(typeof' : 1680 ,  'result' : 1642 ,  'from' : 1640 ,  'Returns' : 1549 ,  'null;' : 1518 ,  'we' : 1495 ,  'return;' : 1429 ,  'array' : 1412 ,  '0' : 1411 ,  '&' : 1388 ,  'true,' : 1381 ,  'cb)' : 1379 ,  'should' : 1346 ,  '[];' : 1297 ,  'path' : 1289 ,  'false,' : 1286 ,  'while' : 1273 ,  '(t)' : 1265 ,  'by' : 1256 ,  'options' : 1252 ,  'assert' : 1250 ,  'type:' : 1234 ,  'i++)' : 1224 ,  'null' : 1221 ,  'break;' : 1206 }
+# A hashed model does not keep its words, so it cannot tell how long the
+# longest is. Words longer than this are hashed by their first
+# hashedLongest + 1 bytes, which is all chunks() keeps of them.
+hashedLongest = 1024
 
-cplusplus = { '//' : 199606 ,  '=' : 124262 ,  '{' : 111007 ,  '}' : 88909 ,  'if' : 64362 ,  'the' : 51906 ,  'return' : 43217 ,  'void' : 37224 ,  'a' : 30266 ,  'to' : 27065 ,  'for' : 26911 ,  'const' : 24195 ,  'of' : 23185 ,  'case' : 22367 ,  'int' : 22043 ,  'is' : 21940 ,  '///' : 21211 ,  'CHECK:' : 21120 ,  '};' : 19450 ,  'struct' : 18760 ,  '<<' : 17860 ,  ':' : 16274 ,  '&&' : 16014 ,  '==' : 14989 ,  'in' : 12586 ,  '-' : 12579 ,  'bool' : 12567 ,  '|' : 11372 ,  '#pragma' : 11244 ,  'omp' : 11176 ,  'class' : 10844 ,  'be' : 10631 ,  'else' : 10245 ,  'and' : 9703 ,  'we' : 9492 ,  'template' : 9186 ,  'this' : 9093 ,  'not' : 8940 ,  '0;' : 8822 ,  'type' : 8759 ,  'that' : 8609 ,  'i' : 8592 ,  'an' : 8338 ,  '!=' : 8153 ,  '"' : 7998 ,  'break;' : 7894 ,  '%s' : 7870 ,  'i32' : 7804 ,  'static' : 7480 ,  'RUN:' : 7463 ,  'false;' : 7426 ,  '||' : 7402 ,  'true;' : 6999 ,  '<' : 6903 ,  'unsigned' : 6832 ,  '#include' : 6637 ,  'with' : 6401 ,  'A' : 6377 ,  '{}' : 6091 ,  'or' : 5921 ,  'call' : 5876 ,  'If' : 5820 ,  '+' : 5814 ,  'function' : 5757 ,  'T>' : 5603 ,  'are' : 5538 ,  'char' : 5196 ,  'return;' : 5176 ,  'it' : 5008 ,  'as' : 4992 ,  '(const' : 4839 ,  '0,' : 4756 ,  'auto' : 4615 ,  'This' : 4606 ,  'have' : 4539 ,  'x' : 4503 ,  'virtual' : 4421 ,  'QualType' : 4402 ,  'parallel' : 4196 ,  'The' : 4084 ,  'from' : 4052 ,  '0' : 3957 ,  'nullptr;' : 3866 ,  'I' : 3840 ,  '?' : 3834 ,  '+=' : 3792 ,  'new' : 3734 ,  'T' : 3715 ,  'define' : 3615 ,  '(int' : 3597 ,  'on' : 3348 ,  'typedef' : 3336 ,  'by' : 3225 ,  'using' : 3136 ,  '++i)' : 3085 ,  'FIXME:' : 3045 ,  '\\' : 3041 ,  'B' : 3030 ,  'here}}' : 3000 ,  'no' : 2971 }
+def bucket(word, buckets):
+    """Return the hash bucket of word, the same in every process."""
+    return zlib.crc32(word[:hashedLongest + 1]) & (buckets - 1)
 
-java = { '{' : 594399 ,  '}' : 582986 ,  '=' : 569661 ,  'public' : 295333 ,  '+' : 248836 ,  'if' : 199625 ,  'return' : 173455 ,  'new' : 169395 ,  'import' : 158535 ,  'int' : 133518 ,  'static' : 103148 ,  'void' : 101021 ,  'private' : 92721 ,  'long' : 91498 ,  'final' : 82146 ,  '==' : 81298 ,  'String' : 72857 ,  '!=' : 63384 ,  'throws' : 59309 ,  '"' : 57523 ,  'null)' : 53530 ,  'else' : 49292 ,  'boolean' : 45951 ,  'throw' : 40572 ,  'for' : 37175 ,  'i' : 37094 ,  '0;' : 34835 ,  'class' : 34724 ,  'null;' : 34576 ,  '<' : 33745 ,  '&&' : 32309 ,  ':' : 30912 ,  'case' : 30457 ,  'try' : 27628 ,  '0,' : 26937 ,  'catch' : 24365 ,  'false;' : 23413 ,  '0)' : 22544 ,  'extends' : 21831 ,  '-' : 21619 ,  '(int' : 20772 ,  '||' : 19489 ,  'package' : 19158 ,  'true;' : 19028 ,  'e)' : 18621 ,  'break;' : 18043 ,  ';' : 16737 ,  'null' : 16731 ,  '>' : 15823 ,  'i++)' : 15288 ,  ')' : 14413 ,  '?' : 13950 ,  '&' : 13323 ,  'Object' : 12427 ,  'String[]' : 10983 ,  '*' : 10901 ,  '+=' : 10868 ,  'while' : 10492 ,  'byte[]' : 10134 ,  'return;' : 10026 ,  'not' : 9664 ,  '1;' : 9246 ,  '>=' : 8799 ,  'null,' : 8616 ,  '0' : 8443 ,  'abstract' : 7973 ,  'true);' : 7833 ,  '1,' : 7641 ,  'Path' : 7515 ,  '};' : 7173 ,  ');' : 7094 ,  'null);' : 6739 ,  'result' : 6702 ,  'false);' : 6491 ,  'finally' : 6153 ,  '256,' : 6018 ,  '@Test' : 5959 ,  '0);' : 5710 ,  '<=' : 5605 ,  'in' : 5511 ,  'char[]' : 5369 ,  '{}' : 5325 ,  '1);' : 5325 ,  'of' : 5177 ,  'double' : 5113 ,  '|' : 5107 ,  'false,' : 5019 ,  'float' : 4959 ,  '(byte)' : 4885 ,  '19002,' : 4883 ,  'x,' : 4799 ,  'args)' : 4694 ,  '",' : 4621 ,  '20283,' : 4602 ,  '19029,' : 4508 ,  '-1;' : 4447 }
+def hash_model(model, buckets=defaultBuckets, bits=defaultBits):
+    """Return the hashed form of model, with buckets buckets and bits (8 or 16) bits per value.
 
+    Words that share a bucket are merged, adding up their probabilities;
+    words in buckets that no word of the model is in are unknown. Only
+    the buckets in use are stored, so buckets can be many. Each class
+    keeps its own scale and offset, so that its values span the whole
+    range of the integer type.
+    """
+    vocabulary, logprobs = model.vocabulary, model.logprobs
+    words = sorted(vocabulary, key=vocabulary.get)
+    wordBuckets = numpy.array([bucket(word, buckets) for word in words], dtype=numpy.int64)
+    used, wordColumns = numpy.unique(wordBuckets, return_inverse=True)
 
-ruby = { '#' : 16500 ,  'end' : 11966 ,  '=' : 10622 ,  'the' : 6374 ,  'def' : 5902 ,  'if' : 4075 ,  'to' : 3113 ,  'a' : 2810 ,  '=>' : 1978 ,  'is' : 1975 ,  'of' : 1921 ,  'do' : 1897 ,  'and' : 1699 ,  'for' : 1604 ,  '##' : 1434 ,  'in' : 1255 ,  'unless' : 1241 ,  'be' : 1238 ,  'require' : 1174 ,  'class' : 1150 ,  '<<' : 1140 ,  'else' : 1129 ,  '==' : 1128 ,  '}' : 1084 ,  'that' : 1039 ,  'true' : 1034 ,  'this' : 957 ,  'return' : 943 ,  '{' : 935 ,  'when' : 904 ,  'then' : 904 ,  '&&' : 902 ,  'gem' : 888 ,  'not' : 823 ,  'or' : 810 ,  'nil' : 761 ,  'raise' : 747 ,  'The' : 746 ,  'are' : 735 ,  '||' : 730 ,  'with' : 704 ,  'from' : 702 ,  'name' : 668 ,  'an' : 665 ,  '"' : 643 ,  ':nodoc:' : 615 ,  'module' : 614 ,  'will' : 580 ,  '<' : 571 ,  '[]' : 544 ,  'false,' : 542 ,  'as' : 537 ,  '||=' : 523 ,  'path' : 517 ,  'nil,' : 507 ,  'by' : 495 ,  'it' : 490 ,  'on' : 488 ,  'If' : 480 ,  'false' : 471 ,  'options' : 470 ,  'version' : 463 ,  ':' : 460 ,  '?' : 456 ,  'value' : 452 ,  'rescue' : 445 ,  'given' : 439 ,  'attr_reader' : 434 ,  'file' : 433 ,  'gems' : 432 ,  '+' : 427 ,  'you' : 427 ,  'spec' : 426 ,  'frozen_string_literal:' : 412 ,  'all' : 404 ,  'Returns' : 403 ,  'can' : 391 ,  'This' : 374 ,  '1' : 367 ,  'source' : 358 ,  '@return' : 354 ,  'command' : 331 ,  '-' : 329 ,  '\\' : 320 ,  '{}' : 303 ,  'begin' : 301 ,  'result' : 296 ,  'your' : 296 ,  'dependency' : 296 ,  'set' : 295 ,  'private' : 294 ,  'use' : 282 ,  'default' : 272 ,  'Bundler' : 270 ,  'used' : 264 ,  'new' : 264 ,  'elsif' : 263 ,  '=~' : 263 ,  '*' : 261 ,  'specs' : 260 }
+    merged = numpy.full((len(model.classes), len(used) + 1), math.log(smoothing))
+    if len(words):
+        order = numpy.argsort(wordColumns, kind="stable")
+        starts = numpy.flatnonzero(numpy.diff(wordColumns[order], prepend=-1))
+        merged[:, :-1] = numpy.log(numpy.add.reduceat(numpy.exp(logprobs[:, order]), starts, axis=1))
 
-perl = { '=' : 71865 ,  '{' : 60869 ,  'my' : 49142 ,  '=>' : 37536 ,  '}' : 32871 ,  '#' : 25755 ,  'if' : 24830 ,  "'sub" : 23745 ,  'return' : 21174 ,  "}'," : 20523 ,  ')' : 16798 ,  '(' : 13307 ,  ');' : 11101 ,  '@_;' : 9223 ,  'the' : 8954 ,  'shift;' : 8936 ,  'unless' : 6937 ,  '};' : 6586 ,  '$self' : 6538 ,  'eq' : 6202 ,  '=~' : 6194 ,  'to' : 6146 ,  ':' : 5922 ,  'and' : 5780 ,  '?' : 5657 ,  'for' : 5653 ,  'or' : 5264 ,  'a' : 5037 ,  '||' : 4710 ,  'else' : 4381 ,  '&&' : 4378 ,  '.' : 4304 ,  'defined' : 4238 ,  'is' : 3648 ,  '$VAR1' : 3299 ,  'not' : 3252 ,  '1' : 3014 ,  'in' : 3008 ,  '0;' : 2987 ,  'push' : 2934 ,  'of' : 2921 ,  '1;' : 2786 ,  "}'" : 2537 ,  '==' : 2503 ,  'elsif' : 2460 ,  '.=' : 2425 ,  '($self,' : 2389 ,  'we' : 2319 ,  'sub' : 2298 ,  '0' : 2195 ,  'be' : 1941 ,  'return;' : 1932 ,  '-' : 1914 ,  '},' : 1893 ,  '[' : 1872 ,  'die' : 1857 ,  'foreach' : 1754 ,  'map' : 1735 ,  'croak' : 1692 ,  '$_' : 1684 ,  'print' : 1672 ,  'ref' : 1626 ,  'it' : 1620 ,  'delete' : 1617 ,  '"' : 1604 ,  'no' : 1583 ,  '||=' : 1544 ,  'local' : 1534 ,  '0,' : 1507 ,  'while' : 1476 ,  '$name' : 1437 ,  '$self,' : 1397 ,  'this' : 1396 ,  'next' : 1376 ,  'require' : 1358 ,  '>' : 1356 ,  'keys' : 1355 ,  'exists' : 1348 ,  "\\'\\';" : 1303 ,  '+' : 1296 ,  '@_' : 1265 ,  '@{' : 1253 ,  'that' : 1252 ,  'shift' : 1218 ,  '$class' : 1201 ,  '1,' : 1168 ,  'with' : 1149 ,  'eval' : 1148 ,  'as' : 1144 ,  "\\'" : 1139 ,  'an' : 1122 ,  'undef' : 1099 ,  'undef;' : 1097 ,  '$self;' : 1088 ,  'name' : 1076 ,  'from' : 1051 ,  '{};' : 1045 ,  '()' : 1039 ,  '$value' : 1011 ,  'on' : 1009 }
+    levels = (1 << bits) - 1
+    low = merged.min(axis=1)
+    scales = numpy.maximum(merged.max(axis=1) - low, 1e-12) / levels
+    offsets = low + scales * (1 << (bits - 1))
+    values = numpy.round((merged - offsets[:, None]) / scales[:, None])
+    values = values.astype(numpy.int8 if bits == 8 else numpy.int16)
+    return model._replace(vocabulary=used.astype(numpy.uint32), logprobs=Quantized(values, scales, offsets, buckets),
+                          version="%s, hashed into %d buckets" % (model.version, buckets), counts=None)
 
-# perl = { '#' : 20217 ,  ';' : 13281 ,  '=' : 7507 ,  '{' : 6315 ,  '}' : 5833 ,  'LETTER' : 5626 ,  'my' : 5253 ,  'the' : 5172 ,  'CJK' : 5098 ,  'if' : 3953 ,  'LATIN' : 3229 ,  'to' : 3033 ,  'WITH' : 2987 ,  '=>' : 2438 ,  'SMALL' : 2250 ,  'is' : 2219 ,  'CAPITAL' : 2064 ,  'a' : 1945 ,  'and' : 1788 ,  'for' : 1766 ,  'of' : 1648 ,  'in' : 1543 ,  'print' : 1373 ,  '=~' : 1262 ,  'or' : 1115 ,  'sub' : 1083 ,  'MARK>' : 1035 ,  '(' : 1023 ,  ')' : 1016 ,  'use' : 974 ,  'that' : 951 ,  'KATAKANA' : 933 ,  'eq' : 883 ,  'be' : 869 ,  'unless' : 788 ,  '"' : 777 ,  'it' : 763 ,  'die' : 760 ,  'we' : 744 ,  'ACUTE' : 740 ,  'not' : 740 ,  'return' : 732 ,  'this' : 718 ,  'RADICAL' : 699 ,  'SOUND' : 696 ,  '##' : 685 ,  'U' : 684 ,  '.' : 679 ,  '-' : 668 ,  'AND' : 654 ,  '+' : 651 ,  'are' : 646 ,  'KANGXI' : 642 ,  '<LATIN' : 627 ,  'else' : 620 ,  '&&' : 606 ,  'ok' : 602 ,  ':' : 598 ,  'with' : 588 ,  'as' : 584 ,  'O' : 578 ,  ');' : 566 ,  '||' : 511 ,  '?' : 506 ,  'from' : 498 ,  'A' : 494 ,  'E' : 492 ,  'file' : 489 ,  'If' : 479 ,  'The' : 478 ,  'defined' : 470 ,  'VOICED' : 467 ,  'GRAVE' : 455 ,  'by' : 441 ,  'push' : 437 ,  'on' : 428 ,  'This' : 419 ,  'foreach' : 411 ,  'elsif' : 410 ,  'new' : 403 ,  '0;' : 403 ,  '1' : 403 ,  'will' : 402 ,  '*' : 400 ,  '1;' : 399 ,  '==' : 399 ,  'an' : 392 ,  'have' : 365 ,  '|' : 357 ,  'all' : 355 ,  'set' : 352 ,  'while' : 347 ,  '};' : 346 ,  '[' : 342 ,  'code' : 342 ,  'shift;' : 338 ,  '@_;' : 335 ,  'next' : 333 ,  '30FC' : 328 ,  'CARON' : 326 }
+def build_model(classes=None, extensions=None, counts=None, version="models.py", byteCounts=None):
+    """Build a model from word counts, by default those in models.py.
 
-c = { '=' : 2676314 ,  '{' : 1368862 ,  '*' : 1254223 ,  '}' : 1051623 ,  'if' : 1022007 ,  '*/' : 854162 ,  '/*' : 807015 ,  'struct' : 703407 ,  'return' : 586933 ,  'int' : 542039 ,  'static' : 478685 ,  '0;' : 328241 ,  'for' : 229611 ,  '#include' : 227685 ,  '==' : 225465 ,  '&' : 223274 ,  '+' : 215075 ,  '0x00,' : 213429 ,  'void' : 211655 ,  'case' : 199378 ,  '#define' : 191776 ,  '},' : 187848 ,  'unsigned' : 181197 ,  'of' : 180900 ,  '-' : 178034 ,  '|' : 174062 ,  '0,' : 161034 ,  'else' : 158414 ,  '<' : 156471 ,  'break;' : 152386 ,  'goto' : 134425 ,  '};' : 129428 ,  'const' : 123385 ,  'in' : 121138 ,  '0)' : 115014 ,  'ret' : 112447 ,  '&&' : 107117 ,  '!=' : 104830 ,  'u32' : 98720 ,  '<<' : 96761 ,  'long' : 89361 ,  '|=' : 85573 ,  'char' : 84254 ,  'ret;' : 78141 ,  '||' : 76388 ,  '1;' : 73291 ,  'this' : 70846 ,  'u8' : 66476 ,  '1,' : 64523 ,  'on' : 63656 ,  '0);' : 62992 ,  'not' : 62199 ,  ':' : 61955 ,  'This' : 61835 ,  'i' : 61716 ,  'device' : 60665 ,  '>' : 60245 ,  'NULL;' : 59736 ,  '0' : 57635 ,  'or' : 56827 ,  '(i' : 55804 ,  'err' : 55224 ,  'with' : 53485 ,  '-EINVAL;' : 52526 ,  '\\' : 52301 ,  '+=' : 52252 ,  '?' : 47432 ,  '>>' : 47102 ,  'as' : 45980 ,  'return;' : 45190 ,  'NULL,' : 44293 ,  'err;' : 41835 ,  '#endif' : 41806 ,  'data' : 41289 ,  '"' : 40969 ,  '1' : 40800 ,  'i++)' : 40540 ,  'switch' : 40141 ,  '/**' : 39990 ,  'while' : 37648 ,  '>=' : 37432 ,  '&=' : 36354 ,  'i;' : 35563 ,  'flags);' : 34566 ,  '1);' : 34558 }
+    counts holds one dict of word -> count per class; words may be str
+    or bytes. byteCounts may hold, for each class, how often each of the
+    256 byte values occurs in its corpus, or None where that is unknown.
+    """
+    if counts is None:
+        import models
+        classes, extensions, counts = models.classes, models.extensions, models.classifiers
 
+    # Normalize classifiers
 
-typescript = { '{' : 64204 ,  '}' : 49367 ,  '=' : 46513 ,  '//' : 27202 ,  'var' : 23998 ,  '////' : 14690 ,  'return' : 14608 ,  'function' : 13574 ,  'if' : 10678 ,  '=>' : 10547 ,  'export' : 8282 ,  'class' : 7461 ,  'const' : 7319 ,  'new' : 5238 ,  'of' : 5033 ,  '===' : 4939 ,  'extends' : 4572 ,  'x' : 4456 ,  '};' : 4248 ,  'case' : 4161 ,  'public' : 4046 ,  '+' : 4018 ,  'for' : 3891 ,  'string;' : 3661 ,  'type' : 3489 ,  '()' : 3469 ,  'let' : 3417 ,  'module' : 3297 ,  'number;' : 3209 ,  'in' : 3187 ,  '&&' : 3170 ,  ':' : 3070 ,  'error' : 3000 ,  '|' : 2984 ,  '*' : 2956 ,  'x:' : 2838 ,  'string' : 2586 ,  '},' : 2574 ,  'number' : 2471 ,  '||' : 2362 ,  'static' : 2344 ,  'true' : 2206 ,  'string,' : 2183 ,  '});' : 2182 ,  'x;' : 2182 ,  'else' : 2172 ,  '1;' : 2171 ,  'private' : 2171 ,  '////}' : 2171 ,  'declare' : 2105 ,  '0;' : 2086 ,  'y' : 1992 ,  '?' : 1934 ,  'y:' : 1920 ,  '<' : 1853 ,  'i' : 1801 ,  'as' : 1797 ,  'number,' : 1792 ,  '-' : 1769 ,  'import' : 1741 ,  'C' : 1732 ,  'not' : 1664 ,  'A' : 1633 ,  'with' : 1606 ,  'typeof' : 1601 ,  'this' : 1562 ,  'number)' : 1543 ,  '!==' : 1535 ,  'a:' : 1533 ,  '////var' : 1478 ,  'T;' : 1443 ,  '*/' : 1425 ,  'b' : 1419 ,  '&' : 1407 ,  'string):' : 1383 ,  'T)' : 1377 ,  'number):' : 1350 ,  '/>' : 1339 ,  'null;' : 1329 ,  '///' : 1315 ,  'this;' : 1298 ,  'any)' : 1295 ,  '/**' : 1292 ,  'ok' : 1292 ,  'kind:' : 1288 ,  'get' : 1260 ,  'void;' : 1243 ,  'text:' : 1224 ,  '1' : 1209 ,  'string)' : 1208 }
+    classifiers = []
+    for i in range(0, len(counts)):
+        total = sum(counts[i].values())
+        classifiers.append({})
+        for j in counts[i].keys():
+            word = j if isinstance(j, bytes) else j.encode()
+            classifiers[i][word] = float(counts[i][j]) / total
 
+    # Build one vocabulary shared by all classifiers, and a dense matrix
+    # of log-probabilities. Words a classifier does not know get the
+    # smoothing value.
 
-classifiers = [cplusplus, javascript, java, c, ruby, perl, typescript, python, scala, php, objc]
+    vocabulary = {}
+    for classifier in classifiers:
+        for word in classifier:
+            vocabulary.setdefault(word, len(vocabulary))
 
-# Normalize classifiers
+    logprobs = numpy.full((len(classifiers), len(vocabulary) + 1), math.log(smoothing))
+    wordCounts = numpy.zeros((len(classifiers), len(vocabulary)))
+    for i in range(0, len(classifiers)):
+        for word, p in classifiers[i].items():
+            logprobs[i, vocabulary[word]] = math.log(p)
+        for word, n in counts[i].items():
+            wordCounts[i, vocabulary[word if isinstance(word, bytes) else word.encode()]] = n
 
-for i in range(0, len(classifiers)):
-    total = reduce(lambda x,y: x+y, classifiers[i].values())
-    for j in classifiers[i].keys():
-        classifiers[i][j] = float(classifiers[i][j]) / total
+    # Byte values never seen in a corpus get one occurrence.
+    bytelogprobs = None
+    histograms = None
+    if byteCounts is not None and len(byteCounts) == len(counts) and all(x is not None for x in byteCounts):
+        histograms = numpy.asarray(byteCounts, dtype=float)
+        bytelogprobs = byte_logprobs(histograms)
 
+    return Model(list(classes), [list(x) for x in extensions], vocabulary, logprobs, version, bytelogprobs,
+                 Counts(wordCounts, wordCounts.sum(axis=1), histograms))
 
-for x in input:
-    fname = x[0]
-    ext = x[1]
+def byte_logprobs(histograms):
+    """Return the log-probabilities of byte values given their counts, one row per class."""
+    histograms = histograms + 1
+    return numpy.log(histograms / histograms.sum(axis=1, keepdims=True))
 
-    counts = {}
-    total = 0
+def learn(model, label, counts, histogram=None, words=learnWords, weight=1):
+    """Return model with the words of a file of language label folded in.
 
-    # Load up input file to be classified.
+    counts maps the words (bytes) of the file to how often they occur,
+    and histogram, if given, counts its byte values; both are multiplied
+    by weight. The class keeps as many of its most frequent words as it
+    held before, and at least words. Only its own log-probabilities are
+    computed again: those of the other classes are carried over as they
+    are. Raises ValueError if the model has no counts or does not know
+    label.
 
-    with open(fname, 'r') as f:
-        # Generate histogram of counts for each word.
-        wordgen = words(f)
-        for word in wordgen:
-            counts[word] = counts.get(word, 0) + 1
-            total += 1
+    Counts from a whole corpus dwarf those of one file: with weight 1, a
+    file only nudges the counts of the words its language already holds,
+    and its other words do not make the cut. To correct the verdict on a
+    file, give it the weight of many files.
+    """
+    if model.counts is None:
+        raise ValueError("the model has no word counts; compile it again")
+    if label not in model.classes:
+        raise ValueError("the model does not know " + label)
+    i = model.classes.index(label)
+    classCount = len(model.classes)
+    known = len(model.vocabulary)
+    vocabulary = dict(model.vocabulary)
+    for word in counts:
+        vocabulary.setdefault(word, len(vocabulary))
 
-    argmax = 0
-    max = float('-inf')
-    secondMax = float('-inf')
+    wordCounts = numpy.zeros((classCount, len(vocabulary)))
+    wordCounts[:, :known] = model.counts.words
+    row = wordCounts[i]
+    held = max(words, numpy.count_nonzero(row))
+    row[[vocabulary[word] for word in counts]] += weight * numpy.fromiter(counts.values(), dtype=float,
+                                                                           count=len(counts))
 
-    for i in xrange(0,len(classifiers)):
+    # Keep the most frequent words, and the older ones among equals.
+    present = numpy.flatnonzero(row)
+    if len(present) > held:
+        row[present[numpy.argsort(-row[present], kind="stable")[held:]]] = 0
 
-        # Naive Bayes.
-        val = 1
-        for word in counts:
-            c       = classifiers[i].get(word, 0.0001)
-            val     += math.log(counts[word] * c)
+    # Drop the words no class holds any more, so that they count as
+    # unknown, as in a model built from the same counts.
+    logprobs = numpy.full((classCount, len(vocabulary) + 1), math.log(smoothing))
+    logprobs[:, :known] = model.logprobs[:, :known]
+    columns = numpy.flatnonzero(wordCounts.any(axis=0))
+    tokens = sorted(vocabulary, key=vocabulary.get)
+    vocabulary = dict((tokens[column], j) for j, column in enumerate(columns))
+    wordCounts = wordCounts[:, columns]
+    logprobs = logprobs[:, numpy.append(columns, len(tokens))]
 
-        # Incorporate a modest prior for the extension
-        for thisext in extensions[i]:
-            if ext == thisext:
-                val /= extensionPrior
+    totals = numpy.array(model.counts.totals, dtype=float)
+    totals[i] = wordCounts[i].sum()
+    logprobs[i] = math.log(smoothing)
+    present = wordCounts[i] > 0
+    logprobs[i, :-1][present] = numpy.log(wordCounts[i, present] / totals[i])
+
+    bytelogprobs, histograms = model.bytelogprobs, model.counts.bytes
+    if histograms is not None and histogram is not None:
+        histograms = numpy.array(histograms)
+        histograms[i] += weight * histogram
+        bytelogprobs = numpy.array(bytelogprobs)
+        bytelogprobs[i] = byte_logprobs(histograms[i:i + 1])[0]
+
+    version = model.version if model.version.endswith("+learned") else model.version + "+learned"
+    return model._replace(vocabulary=vocabulary, logprobs=logprobs, version=version, bytelogprobs=bytelogprobs,
+                          counts=Counts(wordCounts, totals, histograms))
+
+def compile_model(fname, model=None):
+    """Write model (by default, the one built from models.py) to fname in compiled form."""
+    if model is None:
+        model = build_model()
+    vocabulary = model.vocabulary
+    hashed = isinstance(model.logprobs, Quantized)
+    fields = {"classes": model.classes,
+              "extensions": model.extensions,
+              "smoothing": smoothing,
+              "words": len(vocabulary),
+              "version": model.version,
+              "bytes": model.bytelogprobs is not None,
+              "counts": model.counts is not None}
+    if hashed:
+        fields["words"] = model.logprobs.values.shape[1] - 1
+        fields["hashed"] = {"buckets": model.logprobs.buckets, "bits": model.logprobs.values.itemsize * 8}
+        tokens = b""
+    else:
+        tokens = b"\n".join(sorted(vocabulary, key=vocabulary.get))
+    header = json.dumps(fields).encode()
+    prefix = modelPrefix.pack(modelMagic, modelFormat, len(header), len(tokens))
+    used = len(prefix) + len(header) + len(tokens)
+    padding = b"\0" * (-used % 8)
+
+    # Write to a temporary file first so that running processes never
+    # map a half-written model.
+    tmp = fname + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(prefix + header + tokens + padding)
+        if hashed:
+            values = model.logprobs.values
+            f.write(vocabulary.astype("<u4").tobytes() + b"\0" * (len(vocabulary) * 4 % 8))
+            f.write(model.logprobs.scales.astype("<f8").tobytes() + model.logprobs.offsets.astype("<f8").tobytes())
+            f.write(values.astype(values.dtype.newbyteorder("<")).tobytes() + b"\0" * (-values.nbytes % 8))
+        else:
+            f.write(model.logprobs.astype("<f8").tobytes())
+        if model.bytelogprobs is not None:
+            f.write(model.bytelogprobs.astype("<f8").tobytes())
+        if model.counts is not None:
+            f.write(model.counts.words.astype("<f8").tobytes())
+            f.write(numpy.asarray(model.counts.totals).astype("<f8").tobytes())
+            if model.bytelogprobs is not None:
+                f.write(model.counts.bytes.astype("<f8").tobytes())
+    os.replace(tmp, fname)
+
+def load_model(fname):
+    """Map the compiled Model in fname into memory."""
+    with open(fname, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, format, headerLength, tokensLength = modelPrefix.unpack_from(data)
+    if magic != modelMagic or format not in modelFormats:
+        raise ValueError(fname + ": not a pangloss model (format " + str(modelFormat) + ")")
+    offset = modelPrefix.size
+    header = json.loads(data[offset:offset + headerLength])
+    offset += headerLength
+    tokens = data[offset:offset + tokensLength].split(b"\n") if tokensLength else []
+    vocabulary = dict(zip(tokens, range(len(tokens))))
+    offset += tokensLength
+    offset += -offset % 8
+
+    shape = (len(header["classes"]), header["words"] + 1)
+    if "hashed" in header:
+        vocabulary = numpy.frombuffer(data, dtype="<u4", count=header["words"], offset=offset)
+        offset += header["words"] * 4 + header["words"] * 4 % 8
+        scales = numpy.frombuffer(data, dtype="<f8", count=shape[0], offset=offset)
+        offsets = numpy.frombuffer(data, dtype="<f8", count=shape[0], offset=offset + 8 * shape[0])
+        offset += 16 * shape[0]
+        dtype = "<i2" if header["hashed"]["bits"] == 16 else "i1"
+        values = numpy.frombuffer(data, dtype=dtype, count=shape[0] * shape[1], offset=offset)
+        offset += values.nbytes + (-values.nbytes % 8)
+        logprobs = Quantized(values.reshape(shape), scales, offsets, header["hashed"]["buckets"])
+    else:
+        logprobs = numpy.frombuffer(data, dtype="<f8", count=shape[0] * shape[1], offset=offset)
+        offset += logprobs.nbytes
+        logprobs = logprobs.reshape(shape)
+    bytelogprobs = None
+    if header.get("bytes"):
+        bytelogprobs = numpy.frombuffer(data, dtype="<f8", count=shape[0] * 256, offset=offset)
+        bytelogprobs = bytelogprobs.reshape((shape[0], 256))
+        offset += bytelogprobs.nbytes
+    counts = None
+    if header.get("counts"):
+        words = numpy.frombuffer(data, dtype="<f8", count=shape[0] * (shape[1] - 1), offset=offset)
+        offset += words.nbytes
+        totals = numpy.frombuffer(data, dtype="<f8", count=shape[0], offset=offset)
+        offset += totals.nbytes
+        histograms = None
+        if bytelogprobs is not None:
+            histograms = numpy.frombuffer(data, dtype="<f8", count=shape[0] * 256, offset=offset)
+            histograms = histograms.reshape((shape[0], 256))
+        counts = Counts(words.reshape((shape[0], shape[1] - 1)), totals, histograms)
+    return Model(header["classes"], header["extensions"], vocabulary, logprobs,
+                 header.get("version", ""), bytelogprobs, counts)
+
+def invert(logprobs):
+    """Return an inverted index of the log-probabilities of a model.
+
+    Only the log-probabilities that differ from that of the smoothing
+    value are kept, as their excess over it. The classes and excesses of
+    vocabulary column j are classes[start[j]:start[j + 1]] and
+    deltas[start[j]:start[j + 1]] in the (start, classes, deltas) result.
+    """
+    baseline = math.log(smoothing)
+    columns, classes = numpy.nonzero(logprobs.T != baseline)
+    start = numpy.searchsorted(columns, numpy.arange(logprobs.shape[1] + 1))
+    return start, classes, logprobs.T[columns, classes] - baseline
+
+def default_model():
+    """Return the compiled default model, or None to build from models.py."""
+    if os.path.exists(defaultModel):
+        source = os.path.join(os.path.dirname(defaultModel), "models.py")
+        if not os.path.exists(source) or os.path.getmtime(defaultModel) >= os.path.getmtime(source):
+            return defaultModel
+    return None
+
+# Models with at least this many classes are scored through an inverted
+# index (see invert()), whose cost grows with the number of (word, class)
+# pairs that a file matches rather than with the number of classes.
+indexClasses = 32
+
+# Default lead, in nats, of the best class over the runner-up at which
+# streaming classification stops reading.
+streamMargin = 100.0
+
+# Default number and size of the windows read from each file when
+# sampling.
+sampleWindows = 16
+sampleWindowSize = 65536
+
+# Languages whose byte histograms are too much alike to tell apart: the
+# cascade never accepts one of them, leaving such files to the words.
+ambiguousClasses = [("C", "C++", "Objective-C"), ("JavaScript", "TypeScript")]
+
+# Lead, in nats per byte, of the best class over the runner-up at which
+# the cascade accepts the verdict of the byte histogram, and the fewest
+# bytes a file must have for that.
+cascadeLead = 0.1
+cascadeBytes = 1024
+
+# Default number of words in the window that decides the language of each
+# line in region mode, the fewest lines a region may have unless it is
+# the whole file, and the number of words whose running sums are
+# computed at once.
+regionWords = 100
+regionLines = 3
+regionBlock = 65536
+
+# The outcome of classifying one file. scores maps every language to its
+# Naive Bayes score; consumed is the number of bytes read; stage tells
+# whether the "bytes" or the "words" of the file decided.
+Result = collections.namedtuple("Result", ["language", "confidence", "scores", "consumed", "stage"])
+
+class Classifier(object):
+    """Classifies files with one set of language models.
+
+    The models are loaded (or built from models.py) once, when the
+    classifier is created. Classifying never changes the classifier, so
+    one instance can be shared by any number of threads.
+
+    With cascade, files that are read to the end are first scored by
+    their byte histogram, which is much cheaper than splitting them into
+    words; only when that is not decisive are their words scored. This
+    needs a model with byte distributions, as made by train.py.
+
+    With a stats.Stats, the time spent in each phase of the work and the
+    words found are recorded in it for every file; the classifier then
+    may no longer be shared by threads.
+    """
+
+    def __init__(self, model=None, cascade=False, stats=None, hashed=None):
+        """Use the compiled model in the file model, or the default model.
+
+        hashed, a (buckets, bits) pair, turns a model that is not hashed
+        yet into its hashed form (see hash_model()) as it is loaded.
+        """
+        self.stats = stats
+        if stats is not None:
+            stats.start()
+        self.model = model or default_model()
+        loaded = build_model() if self.model is None else load_model(self.model)
+        self.hashed = hashed
+        if hashed is not None and not isinstance(loaded.logprobs, Quantized):
+            loaded = hash_model(loaded, *hashed)
+        if stats is not None:
+            stats.stop("load")
+        self.wantCascade = cascade
+        self.use_model(loaded)
+
+    def use_model(self, model):
+        """Classify with the Model model from now on."""
+        self.loaded = model
+        self.classes, self.extensions, self.vocabulary, self.logprobs, self.version, self.bytelogprobs = model[:6]
+        self.quantized = isinstance(self.logprobs, Quantized)
+        if self.quantized:
+            self.unknown = self.logprobs.values.shape[1] - 1
+            self.buckets = self.logprobs.buckets
+            self.longest = hashedLongest
+        else:
+            self.unknown = len(self.vocabulary)
+            self.longest = max(map(len, self.vocabulary), default=0)
+        self.cascade = self.wantCascade and self.bytelogprobs is not None
+        self.ambiguous = set(i for i in range(0, len(self.classes))
+                             if any(self.classes[i] in group for group in ambiguousClasses))
+        self.postings = None
+        if len(self.classes) >= indexClasses and not self.quantized:
+            self.postings = invert(self.logprobs)
+
+        # Divisor for each class's score, per extension.
+        self.extensionPriors = {}
+        for i in range(0, len(self.extensions)):
+            for thisext in self.extensions[i]:
+                self.extensionPriors.setdefault(thisext, numpy.ones(len(self.classes)))[i] = extensionPrior
+        self.noPrior = numpy.ones(len(self.classes))
+        self._fingerprint = None
+
+    def update(self, path, label, words=learnWords, weight=1):
+        """Fold the words of the file path, of language label, into the model (see learn()).
+
+        The change is kept in memory until save(); worker processes of
+        classify_many() load the model from its file, so they do not see
+        it until then. Raises ValueError if the model cannot learn, and
+        OSError if path cannot be read.
+        """
+        if self.quantized:
+            raise ValueError("a hashed model cannot learn")
+        with open(path, 'rb') as f:
+            data = f.read()
+        histogram = numpy.bincount(numpy.frombuffer(data, dtype=numpy.uint8), minlength=256)
+        self.use_model(learn(self.loaded, label, collections.Counter(data.split()), histogram, words, weight))
+
+    def save(self, fname=None):
+        """Write the model in compiled form to fname, by default the file it came from.
+
+        A model built from models.py is written to the default model file.
+        """
+        compile_model(fname or self.model or defaultModel, self.loaded)
+
+    def fingerprint(self):
+        """Return a digest of the model and extension prior in use.
+
+        Results computed with a different fingerprint may differ.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1(json.dumps([self.classes, self.extensions, extensionPrior, scoringVersion]).encode())
+            if self.quantized:
+                digest.update(str(self.logprobs.buckets).encode())
+                for array in [self.vocabulary] + list(self.logprobs[:3]):
+                    digest.update(numpy.ascontiguousarray(array).tobytes())
+            else:
+                digest.update(b"\n".join(sorted(self.vocabulary, key=self.vocabulary.get)))
+                digest.update(numpy.ascontiguousarray(self.logprobs).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def prior(self, ext):
+        """Return the divisor of each class's score for files with extension ext."""
+        return self.extensionPriors.get(ext, self.noPrior)
+
+    def tally(self, chunk):
+        """Count the words of chunk by vocabulary column.
+
+        Returns an array of distinct columns and an array of how often
+        each occurs. Words that are in no classifier are not told apart:
+        all of them are counted together in the last column.
+        """
+        if self.quantized:
+            return self.tally_hashed(chunk)
+        if self.stats is not None:
+            self.stats.start()
+        histogram = collections.Counter(chunk)
+        known = histogram.keys() & self.vocabulary.keys()
+        columns = [self.vocabulary[word] for word in known]
+        counts = [histogram[word] for word in known]
+        unknown = len(chunk) - sum(counts)
+        if unknown:
+            columns.append(self.unknown)
+            counts.append(unknown)
+        columns = numpy.array(columns, dtype=numpy.intp)
+        counts = numpy.array(counts, dtype=numpy.int64)
+        if self.stats is not None:
+            self.stats.stop("count")
+            self.stats.counted(len(chunk), unknown)
+        return columns, counts
+
+    def tally_hashed(self, chunk):
+        """Do what tally() does, for a hashed model."""
+        if self.stats is not None:
+            self.stats.start()
+        histogram = collections.Counter(chunk)
+        buckets = numpy.fromiter((bucket(word, self.buckets) for word in histogram), dtype=numpy.uint32,
+                                 count=len(histogram))
+        columns = numpy.minimum(numpy.searchsorted(self.vocabulary, buckets), self.unknown - 1)
+        columns[self.vocabulary[columns] != buckets] = self.unknown
+        columns, where = numpy.unique(columns, return_inverse=True)
+        counts = numpy.bincount(where, numpy.fromiter(histogram.values(), dtype=float, count=len(histogram)))
+        counts = counts.astype(numpy.int64)
+        if self.stats is not None:
+            self.stats.stop("count")
+            self.stats.counted(len(chunk), counts[-1] if len(columns) and columns[-1] == self.unknown else 0)
+        return columns.astype(numpy.intp), counts
+
+    def score(self, counts):
+        """Return the Naive Bayes score of every class for a vector of counts.
+
+        counts holds the number of occurrences of each vocabulary word,
+        followed by that of all other words (see tally()). The extension
+        prior is not included; divide by prior(ext) for it.
+        """
+        # Each distinct word contributes its log-probability once (its
+        # count only adds log(count), which is the same for every class).
+        present = counts > 0
+        if self.postings is None and not self.quantized:
+            return 1 + numpy.log(counts[present]).sum() + self.logprobs.dot(present)
+        return 1 + numpy.log(counts[present]).sum() + self.column_sums(numpy.flatnonzero(present))
+
+    def column_sums(self, columns):
+        """Return the sum of the log-probabilities of each class over distinct vocabulary columns."""
+        if self.quantized:
+            # Only integers are added up; each class's offset and scale
+            # are applied once to the sum.
+            values, scales, offsets, buckets = self.logprobs
+            return len(columns) * offsets + scales * values[:, columns].sum(axis=1)
+        if self.postings is None:
+            return self.logprobs[:, columns].sum(axis=1)
+        # Every class gets the smoothing value for every column, plus the
+        # excess of the postings of the columns. Classes with no postings,
+        # whatever the extension, keep the baseline and rarely win.
+        start, classes, deltas = self.postings
+        begin = start[columns]
+        lengths = start[columns + 1] - begin
+        # The positions of all postings of the columns, in one array.
+        positions = numpy.repeat(begin - numpy.cumsum(lengths) + lengths, lengths) + numpy.arange(lengths.sum())
+        return len(columns) * math.log(smoothing) + numpy.bincount(classes[positions], deltas[positions],
+                                                                   len(self.classes))
+
+    def stream_score(self, fileobj, ext, margin=streamMargin, budget=None):
+        """Score fileobj as it is read, stopping once the decision is safe.
+
+        Keeps the same per-class scores as score() up to date chunk by
+        chunk and stops as soon as the best class leads the second best
+        by margin, or once budget bytes have been read. Returns the scores
+        and the number of bytes read.
+        """
+        counts = numpy.zeros(self.unknown + 1, dtype=numpy.int64)
+        logCounts = 0.0
+        logprobSums = numpy.zeros(len(self.classes))
+        prior = self.prior(ext)
+        val = (1 + logprobSums) / prior
+        consumed = 0
+        for chunk, consumed in chunks(fileobj, 16384, budget, self.stats, self.longest):
+            columns, added = self.tally(chunk)
+            if self.stats is not None:
+                self.stats.start()
+            before = counts[columns]
+            counts[columns] = before + added
+            # The new log-counts replace the old ones in the sum, and words
+            # seen for the first time add their log-probabilities.
+            seen = before > 0
+            logCounts += numpy.log(before + added).sum() - numpy.log(before[seen]).sum()
+            new = columns[~seen]
+            if len(new):
+                logprobSums += self.column_sums(new)
+            val = (1 + logCounts + logprobSums) / prior
+            secondMax, max = numpy.partition(val, -2)[-2:]
+            if self.stats is not None:
+                self.stats.stop("score")
+            if max - secondMax >= margin:
+                break
+        return val, consumed
+
+    def sample_score(self, fileobj, windows=sampleWindows, windowSize=sampleWindowSize):
+        """Score evenly spaced windows of a seekable fileobj instead of all of it.
+
+        Reads windows windows of windowSize bytes, the first at the start
+        of the file and the last at its end. Words cut by the edge of a
+        window are left out. Files no larger than all windows together
+        are read whole. Returns the scores and the number of bytes read.
+        """
+        size = fileobj.seek(0, os.SEEK_END)
+        fileobj.seek(0)
+        if size <= windows * windowSize:
+            return self.read_scores(fileobj)
+        counts = numpy.zeros(self.unknown + 1, dtype=numpy.int64)
+        consumed = 0
+        for i in range(windows):
+            offset = i * (size - windowSize) // max(1, windows - 1)
+            # Read one more byte on each side to tell whether the words at
+            # the edges are whole.
+            start = max(0, offset - 1)
+            if self.stats is not None:
+                self.stats.start()
+            fileobj.seek(start)
+            data = fileobj.read(offset + windowSize + 1 - start)
+            if self.stats is not None:
+                self.stats.stop("read")
+                self.stats.start()
+            consumed += len(data)
+            words = data.split()
+            if start < offset and words and not data[:1].isspace():
+                words.pop(0)
+            if start + len(data) < size and words and not data[-1:].isspace():
+                words.pop()
+            if self.stats is not None:
+                self.stats.stop("split")
+            columns, added = self.tally(words)
+            counts[columns] += added
+        return self.timed_score(counts), consumed
+
+    def byte_score(self, fileobj):
+        """Read fileobj to the end; return the scores of its byte histogram and the bytes read."""
+        histogram = numpy.zeros(256, dtype=numpy.int64)
+        consumed = 0
+        while True:
+            if self.stats is not None:
+                self.stats.start()
+            data = fileobj.read(readSize)
+            if self.stats is not None:
+                self.stats.stop("read")
+            if not data:
                 break
+            consumed += len(data)
+            if self.stats is not None:
+                self.stats.start()
+            histogram += numpy.bincount(numpy.frombuffer(data, dtype=numpy.uint8), minlength=256)
+            if self.stats is not None:
+                self.stats.stop("bytes")
+        return self.bytelogprobs.dot(histogram), consumed
+
+    def cascade_result(self, fileobj, ext):
+        """Return the Result the byte histogram of fileobj decides, or None if it is unclear.
+
+        The extension is not taken into account: dividing the scores of a
+        whole file by the prior would give its language a lead that
+        grows with the file, and that soon exceeds cascadeLead per byte.
+        """
+        scores, consumed = self.byte_score(fileobj)
+        order = numpy.argsort(scores)
+        if consumed < cascadeBytes or order[-1] in self.ambiguous or \
+           scores[order[-1]] - scores[order[-2]] < cascadeLead * consumed:
+            return None
+        return self.result(scores, consumed, "bytes")
+
+    def result(self, scores, consumed, stage="words"):
+        """Return the Result for the given class scores."""
+        order = numpy.argsort(scores)
+        argmax = order[-1]
+        secondMax = scores[order[-2]]
+        return Result(self.classes[argmax],
+                      float(1 - (scores[argmax] / secondMax)),
+                      dict(zip(self.classes, scores.tolist())),
+                      consumed,
+                      stage)
+
+    def classify_file(self, fileobj, ext="", margin=None, budget=None, sample=None):
+        """Classify the contents of a binary file object.
+
+        ext is the extension hint, such as ".c". With sample, a (windows,
+        window size) pair, only parts of a seekable file are read (see
+        sample_score()). With a margin or a budget, the file is streamed
+        and reading stops early (see stream_score()). Otherwise it is
+        read to the end; the cascade only applies to seekable files, as
+        they must be read again if it cannot decide.
+        """
+        if self.stats is None:
+            return self.classify_contents(fileobj, ext, margin, budget, sample)
+        self.stats.begin()
+        result = self.classify_contents(fileobj, ext, margin, budget, sample)
+        self.stats.end(getattr(fileobj, "name", None), result.consumed, result)
+        return result
+
+    def classify_contents(self, fileobj, ext, margin, budget, sample):
+        if sample is not None and fileobj.seekable():
+            scores, consumed = self.sample_score(fileobj, *sample)
+            return self.result(scores / self.prior(ext), consumed)
+        if margin is not None or budget is not None:
+            return self.result(*self.stream_score(fileobj, ext, streamMargin if margin is None else margin, budget))
+        if self.cascade and fileobj.seekable():
+            result = self.cascade_result(fileobj, ext)
+            if result is not None:
+                return result
+            fileobj.seek(0)
+        scores, consumed = self.read_scores(fileobj)
+        # Incorporate a modest prior for the extension
+        return self.result(scores / self.prior(ext), consumed)
+
+    def read_scores(self, fileobj):
+        """Read fileobj to the end; return its score() and the bytes read.
+
+        Only one chunk of words is held at a time, and only vocabulary
+        words are counted, so memory does not grow with the file.
+        """
+        counts = numpy.zeros(self.unknown + 1, dtype=numpy.int64)
+        consumed = 0
+        for chunk, consumed in chunks(fileobj, readSize, None, self.stats, self.longest):
+            columns, added = self.tally(chunk)
+            counts[columns] += added
+        return self.timed_score(counts), consumed
+
+    def timed_score(self, counts):
+        """Return score(counts), timing it in the stats, if any."""
+        if self.stats is None:
+            return self.score(counts)
+        self.stats.start()
+        scores = self.score(counts)
+        self.stats.stop("score")
+        return scores
+
+    def classify_path(self, path, ext=None, margin=None, budget=None, sample=None):
+        """Classify the file at path; ext defaults to the file's own extension."""
+        if ext is None:
+            ext = os.path.splitext(path)[1]
+        with open(path, 'rb') as f:
+            return self.classify_file(f, ext, margin, budget, sample)
+
+    def classify_bytes(self, data, ext="", margin=None, budget=None, sample=None):
+        """Classify a bytes object."""
+        return self.classify_file(io.BytesIO(data), ext, margin, budget, sample)
+
+    def columns(self, words):
+        """Return the vocabulary column of each of words, as an array."""
+        if self.quantized:
+            buckets = numpy.fromiter((bucket(word, self.buckets) for word in words), dtype=numpy.uint32,
+                                     count=len(words))
+            columns = numpy.minimum(numpy.searchsorted(self.vocabulary, buckets), self.unknown - 1)
+            columns[self.vocabulary[columns] != buckets] = self.unknown
+            return columns.astype(numpy.intp)
+        get = self.vocabulary.get
+        return numpy.fromiter((get(word, self.unknown) for word in words), dtype=numpy.intp, count=len(words))
+
+    def running_sums(self, columns, signs, positions):
+        """Return the log-probabilities of each class summed over columns[:p], for each p in positions.
+
+        Each column's log-probabilities are multiplied by its sign, 1 or
+        -1, in signs. positions must be sorted; the result has one column
+        per position. The sums are carried from block to block of
+        regionBlock columns, so that memory stays bounded.
+        """
+        if self.quantized:
+            values, scales, offsets, buckets = self.logprobs
+        sums = numpy.zeros((len(self.classes), len(positions)))
+        carried = numpy.zeros(len(self.classes))
+        first = 0
+        for start in range(0, len(columns) + 1, regionBlock):
+            end = min(start + regionBlock, len(columns))
+            last = numpy.searchsorted(positions, end, side="right")
+            block = columns[start:end]
+            if self.quantized:
+                steps = offsets[:, None] + scales[:, None] * values[:, block]
+            else:
+                steps = self.logprobs[:, block]
+            steps = steps * signs[start:end]
+            running = numpy.concatenate([carried[:, None], carried[:, None] + numpy.cumsum(steps, axis=1)], axis=1)
+            sums[:, first:last] = running[:, positions[first:last] - start]
+            carried = running[:, -1]
+            first = last
+        return sums
+
+    def regions(self, data, ext="", words=regionWords, lines=regionLines):
+        """Split data into regions of lines in one language.
+
+        Returns a list of (first line, last line, language, confidence),
+        with lines numbered from 1. Each line takes the language of the
+        window of words words around its middle, scored like a file, by
+        the distinct words in it. As the window moves from one line to
+        the next, a word that enters it adds its log-probabilities to the
+        score of each class if it was not in the window yet, and a word
+        that leaves it subtracts them if it was there only once, so the
+        time is linear in the length of data. Regions shorter than lines
+        lines then join the region before them (or after them, at the
+        start). The confidence of a region is the mean over its lines of
+        the confidence of their windows in its language, computed as for
+        a file, and no less than 0 (lines that joined it from a short
+        region of another language count against it).
+        """
+        texts = data.split(b"\n")
+        if len(texts) > 1 and not texts[-1]:
+            texts.pop()
+        tokens = []
+        ends = numpy.empty(len(texts), dtype=numpy.intp)
+        for i in range(0, len(texts)):
+            tokens.extend(texts[i].split())
+            ends[i] = len(tokens)
+        if not tokens:
+            return []
+        starts = numpy.concatenate([[0], ends[:-1]])
+        columns = self.columns(tokens)
+
+        # The window of each line, kept within the file.
+        high = numpy.clip((starts + ends) // 2 + words // 2, 0, len(tokens))
+        high = numpy.maximum(high, min(words, len(tokens))).tolist()
+        low = numpy.maximum(numpy.array(high) - words, 0).tolist()
+
+        # Record the words that enter or leave the set of distinct words
+        # of the window, and how many have done so by each line.
+        held = collections.defaultdict(int)
+        changes = []
+        signs = []
+        marks = numpy.empty(len(texts), dtype=numpy.intp)
+        tokenColumns = columns.tolist()
+        entered = left = 0
+        for i in range(0, len(texts)):
+            for column in tokenColumns[entered:high[i]]:
+                held[column] += 1
+                if held[column] == 1:
+                    changes.append(column)
+                    signs.append(1.0)
+            for column in tokenColumns[left:low[i]]:
+                held[column] -= 1
+                if not held[column]:
+                    changes.append(column)
+                    signs.append(-1.0)
+            entered, left = high[i], low[i]
+            marks[i] = len(changes)
+        scores = self.running_sums(numpy.array(changes, dtype=numpy.intp), numpy.array(signs), marks)
+        scores = scores / self.prior(ext)[:, None]
+        labels = numpy.argmax(scores, axis=0)
+
+        # Runs of lines of one language, short ones merged into their
+        # neighbour.
+        cuts = numpy.flatnonzero(numpy.diff(labels)) + 1
+        runs = [[first, last, labels[first]] for first, last in
+                zip(numpy.concatenate([[0], cuts]), numpy.concatenate([cuts, [len(labels)]]))]
+        merged = []
+        for run in runs:
+            if merged and (run[1] - run[0] < lines or merged[-1][2] == run[2]):
+                merged[-1][1] = run[1]
+            elif merged and merged[-1][1] - merged[-1][0] < lines:
+                merged[-1][1:] = run[1:]
+            else:
+                merged.append(run)
+
+        regions = []
+        for first, last, label in merged:
+            confidence = 0.0
+            if len(self.classes) > 1:
+                others = numpy.delete(scores[:, first:last], label, axis=0).max(axis=0)
+                confidence = max(0.0, float(numpy.mean(1 - scores[label, first:last] / others)))
+            regions.append((int(first) + 1, int(last), self.classes[label], confidence))
+        return regions
+
+    def regions_path(self, path, ext=None, words=regionWords):
+        """Return the regions() of the file at path; ext defaults to its own extension."""
+        if ext is None:
+            ext = os.path.splitext(path)[1]
+        with open(path, 'rb') as f:
+            return self.regions(f.read(), ext, words)
+
+    def regions_many(self, paths, jobs=1, ordered=True, words=regionWords):
+        """Yield (path, regions) pairs for many files, as classify_many() does (Results aside)."""
+        entries = ((x, None) if isinstance(x, str) else x for x in paths)
+        if jobs <= 1:
+            for path, ext in entries:
+                yield path, self.regions_path(path, ext, words)
+            return
+        initargs = (self.model, None, False, False, self.hashed)
+        with multiprocessing.Pool(jobs, _init_worker, initargs) as pool:
+            task = functools.partial(_regions_entry, words=words)
+            if ordered:
+                results = pool.imap(task, entries, 16)
+            else:
+                results = pool.imap_unordered(task, entries, 16)
+            yield from results
+
+    def classify_archive(self, path, depth=None, margin=None, budget=None, sample=None):
+        """Classify the text files in the archive at path, yielding (name, Result, size) triples.
+
+        Names are path!member (see archive.members(), which also tells
+        which archives are supported and what depth means); the
+        extension hint is that of the member. size is the member's size,
+        or None if unknown. Members whose data is corrupt are reported on
+        stderr and skipped.
+        """
+        import archive
+        with open(path, 'rb') as f:
+            for name, member, size in archive.members(f, path, depth or archive.defaultDepth):
+                try:
+                    result = self.classify_file(member, os.path.splitext(name)[1], margin, budget, sample)
+                except archive.memberErrors as e:
+                    archive.skipped(name, e)
+                    continue
+                yield name, result, size
+
+    def classify_many(self, paths, jobs=1, ordered=True, margin=None, budget=None, cache=None, sample=None,
+                      readahead=None):
+        """Classify many files, yielding (path, Result) pairs.
+
+        paths holds file names or (file name, extension hint) pairs, and
+        may be a generator. With jobs > 1 the files are spread over that
+        many processes, each with its own classifier for this model;
+        unless ordered, results are then yielded as they complete.
+
+        With a cache.Cache, files that are read to the end are looked up
+        in the cache first, and new results are stored in it.
+
+        In a single process, readahead, if given, is a number of bytes:
+        files are then read ahead on threads, holding at most that much
+        at once, while earlier ones are classified (see pipeline.py);
+        unless ordered, results are yielded as the reads complete. Files
+        that cannot be read, as when they are removed while a stream of
+        names is being read, are then reported on stderr and skipped.
+        """
+        entries = ((x, None) if isinstance(x, str) else x for x in paths)
+        if margin is not None or budget is not None or sample is not None:
+            cache = None
+        if jobs <= 1 and readahead is not None and cache is None and sample is None:
+            import pipeline
+            for path, ext, contents in pipeline.prefetch(entries, ordered, budget=readahead, limit=budget):
+                if contents is None:
+                    try:
+                        result = self.classify_path(path, ext, margin, budget)
+                    except OSError as e:
+                        print("pangloss: " + path + ": " + (e.strerror or str(e)), file=sys.stderr)
+                        continue
+                    yield path, result
+                    continue
+                fileobj = io.BytesIO(contents)
+                fileobj.name = path
+                yield path, self.classify_file(fileobj, os.path.splitext(path)[1] if ext is None else ext,
+                                               margin, budget)
+            return
+        if jobs <= 1:
+            for path, ext in entries:
+                if cache is None:
+                    yield path, self.classify_path(path, ext, margin, budget, sample)
+                    continue
+                if self.stats is not None:
+                    self.stats.begin()
+                result = self.cached_result(cache, path, ext, cache.probe(self, path))
+                if self.stats is not None:
+                    self.stats.end(path, result.consumed, result)
+                yield path, result
+            return
+
+        # Each worker loads the model once; tasks only carry (path, ext)
+        # pairs and are handed out in chunks to keep IPC overhead down.
+        if hasattr(paths, "__len__"):
+            chunksize = max(1, min(256, len(paths) // (jobs * 4)))
+        else:
+            chunksize = 16
+        initargs = (self.model, cache and cache.directory, self.cascade, self.stats is not None, self.hashed)
+        with multiprocessing.Pool(jobs, _init_worker, initargs) as pool:
+            if cache is None:
+                task = functools.partial(_classify_entry, margin=margin, budget=budget, sample=sample)
+            else:
+                task = _probe_entry
+            if ordered:
+                results = pool.imap(task, entries, chunksize)
+            else:
+                results = pool.imap_unordered(task, entries, chunksize)
+            for result in results:
+                # Workers send back the stats records of their files.
+                if self.stats is not None:
+                    for record in result[-1]:
+                        self.stats.add(record)
+                if cache is None:
+                    yield result[:2]
+                else:
+                    path, ext, probe, records = result
+                    yield path, self.cached_result(cache, path, ext, probe)
+
+    def cached_result(self, cache, path, ext, probe):
+        """Record the outcome of cache.probe() for path; return its Result."""
+        scores, consumed = cache.record(path, probe)
+        if ext is None:
+            ext = os.path.splitext(path)[1]
+        return self.result(scores / self.prior(ext), consumed)
+
+# The classifier and cache used by classify_many() workers, and the stats
+# records of the files they classified since the last task.
+_classifier = None
+_cache = None
+_records = []
+
+def _init_worker(model, cacheDirectory=None, cascade=False, withStats=False, hashed=None):
+    global _classifier, _cache
+    recorder = None
+    if withStats:
+        import stats
+        recorder = stats.Stats(hook=_records.append)
+    _classifier = Classifier(model, cascade, recorder, hashed)
+    if cacheDirectory is not None:
+        import cache
+        _cache = cache.Cache(_classifier.fingerprint(), cacheDirectory, writer=False)
+
+def _take_records():
+    records = _records[:]
+    del _records[:]
+    return records
+
+def _classify_entry(entry, margin=None, budget=None, sample=None):
+    return entry[0], _classifier.classify_path(entry[0], entry[1], margin, budget, sample), _take_records()
+
+def _regions_entry(entry, words=regionWords):
+    return entry[0], _classifier.regions_path(entry[0], entry[1], words)
+
+def _probe_entry(entry):
+    if _classifier.stats is not None:
+        _classifier.stats.begin()
+    probe = _cache.probe(_classifier, entry[0])
+    if _classifier.stats is not None:
+        _classifier.stats.end(entry[0], probe[4])
+    return entry[0], entry[1], probe, _take_records()
+
+def archive_results(classifier, path, depth, margin, budget, sample):
+    """Yield what classifier.classify_archive() does, reporting a broken archive on stderr.
+
+    Members of unknown size are taken to be as long as what was read.
+    """
+    import archive
+    try:
+        for name, result, size in classifier.classify_archive(path, depth, margin, budget, sample):
+            yield name, result, result.consumed if size is None else size
+    except archive.errors as e:
+        print("pangloss: " + path + ": " + str(e), file=sys.stderr)
+
+def shard(path, shards):
+    """Return the shard, out of shards, that the file at path belongs to."""
+    return zlib.crc32(os.fsencode(path)) % shards
+
+def parse_result(line):
+    """Return the filename and language of a result line as main() prints it."""
+    fields = line.rstrip("\n").split(",")
+    # The fields after the language are numbers.
+    i = len(fields) - 1
+    while i > 1:
+        try:
+            float(fields[i])
+        except ValueError:
+            break
+        i -= 1
+    return ",".join(fields[:i]), fields[i]
+
+def checkpoint(fname):
+    """Return the filenames of the results in fname, and fname open for appending more.
+
+    A last line cut short, by a shard that stopped while writing it, is
+    dropped, and its file is classified again.
+    """
+    done = set()
+    if os.path.exists(fname):
+        with open(fname, 'r+b') as f:
+            data = f.read()
+            data = data[:data.rfind(b"\n") + 1]
+            f.truncate(len(data))
+        for line in data.decode("utf-8", "surrogateescape").splitlines():
+            done.add(parse_result(line.rsplit(",", 1)[0])[0])
+    return done, open(fname, 'a', errors="surrogateescape")
+
+def merge(fnames, summary=False):
+    """Print the results in the output files fnames of shards, as main() does for --merge.
+
+    Each line of an output file ends with the size of its file, as the
+    shard saw it; the lines are printed without it, and the share of
+    each language is that of these sizes.
+    """
+    results = {}
+    for fname in fnames:
+        with open(fname, errors="surrogateescape") as f:
+            for line in f:
+                if line.endswith("\n"):
+                    line, size = line[:-1].rsplit(",", 1)
+                    results[parse_result(line)[0]] = (line, int(size))
+    totals = collections.Counter()
+    for name in sorted(results):
+        line, size = results[name]
+        print(line)
+        totals[parse_result(line)[1]] += size
+    if summary:
+        import scan
+        for line in scan.summary(totals):
+            print(line)
+
+def print_regions(classifier, input, archives, jobs, ordered, words, depth):
+    """Print the regions of each file and archive member, as main() does for --regions."""
+    import archive
+    def show(fname, regions):
+        for first, last, language, confidence in regions:
+            print("%s,%d-%d,%s,%s" % (fname, first, last, language, confidence))
+    for fname, regions in classifier.regions_many(input, jobs, ordered, words):
+        show(fname, regions)
+    for path in archives:
+        try:
+            with open(path, 'rb') as f:
+                for name, member, size in archive.members(f, path, depth or archive.defaultDepth):
+                    try:
+                        data = member.read()
+                    except archive.memberErrors as e:
+                        archive.skipped(name, e)
+                        continue
+                    show(name, classifier.regions(data, os.path.splitext(name)[1], words))
+        except archive.errors as e:
+            print("pangloss: " + path + ": " + str(e), file=sys.stderr)
+
+def classify_history(classifier, repository, revisions, vendored, summary, cacheDirectory, cacheSize, cacheStats):
+    """Print the language totals of each commit revisions name, as main() does for --git."""
+    import gitrepo
+    resultCache = None
+    if cacheDirectory is not None:
+        import cache
+        resultCache = cache.Cache(classifier.fingerprint(), cacheDirectory or None,
+                                  cacheSize or cache.defaultEntries)
+    try:
+        for commit, totals in gitrepo.history(classifier, repository, revisions, resultCache, vendored):
+            for language in sorted(totals, key=lambda language: (-totals[language][0], language)):
+                print("%s,%s,%d,%d" % (commit, language, totals[language][0], totals[language][1]))
+            if summary:
+                import scan
+                for line in scan.summary(dict((language, total[0]) for language, total in totals.items())):
+                    print(line)
+    except subprocess.CalledProcessError as e:
+        print("pangloss: git failed: " + str(e), file=sys.stderr)
+        sys.exit(1)
+    if resultCache is not None:
+        if cacheStats:
+            print(resultCache.statistics(), file=sys.stderr)
+        resultCache.close()
+
+def main(argv):
+    input = []
+    jobs = 1
+    jobsGiven = False
+    ordered = False
+    model = None
+    stream = False
+    margin = None
+    budget = None
+    sample = None
+    window = sampleWindowSize
+    exclude = []
+    vendored = False
+    totals = None
+    cacheDirectory = None
+    cacheSize = None
+    cacheStats = False
+    cascade = False
+    showStats = False
+    traceFile = None
+    archiveDepth = None
+    readStdin = False
+    separator = b"\n"
+    readahead = None
+    repository = None
+    compiled = None
+    label = None
+    learnSize = learnWords
+    learnWeight = 1
+    regionSize = None
+    shardIndex = None
+    shards = 1
+    outputFile = None
+    merging = False
+    bits = None
+    buckets = defaultBuckets
+    args = [argv[0]]
+    for arg in argv[1:]:
+        if arg.startswith("--jobs="):
+            jobsGiven = True
+            try:
+                jobs = int(arg[7:]) or os.cpu_count()
+            except ValueError:
+                help()
+        elif arg == "--ordered":
+            ordered = True
+        elif arg == "--stream":
+            stream = True
+        elif arg.startswith("--margin=") or arg.startswith("--max-bytes="):
+            stream = True
+            try:
+                if arg.startswith("--margin="):
+                    margin = float(arg[9:])
+                else:
+                    budget = int(arg[12:])
+            except ValueError:
+                help()
+        elif arg == "--sample" or arg.startswith("--sample=") or arg.startswith("--window="):
+            try:
+                if arg.startswith("--window="):
+                    window = int(arg[9:])
+                else:
+                    sample = int(arg[9:] or sampleWindows)
+            except ValueError:
+                help()
+        elif arg.startswith("--exclude="):
+            exclude.append(arg[10:])
+        elif arg == "--vendored":
+            vendored = True
+        elif arg == "--summary":
+            totals = collections.Counter()
+        elif arg == "--cache" or arg.startswith("--cache="):
+            cacheDirectory = arg[8:]
+        elif arg.startswith("--cache-size="):
+            try:
+                cacheSize = int(arg[13:])
+            except ValueError:
+                help()
+        elif arg == "--cache-stats":
+            cacheStats = True
+        elif arg == "--cascade":
+            cascade = True
+        elif arg == "--stats":
+            showStats = True
+        elif arg.startswith("--trace="):
+            traceFile = arg[8:]
+        elif arg.startswith("--git="):
+            repository = arg[6:]
+        elif arg == "--stdin":
+            readStdin = True
+        elif arg == "-0":
+            readStdin = True
+            separator = b"\0"
+        elif arg.startswith("--read-ahead="):
+            try:
+                readahead = int(arg[13:])
+            except ValueError:
+                help()
+        elif arg.startswith("--archive-depth="):
+            try:
+                archiveDepth = int(arg[16:])
+            except ValueError:
+                help()
+        elif arg.startswith("--model="):
+            model = arg[8:]
+        elif arg == "--compile-model" or arg.startswith("--compile-model="):
+            compiled = arg[16:] or defaultModel
+        elif arg == "--regions" or arg.startswith("--regions="):
+            try:
+                regionSize = int(arg[10:] or regionWords)
+            except ValueError:
+                help()
+            if regionSize < 1:
+                help()
+        elif arg.startswith("--shard="):
+            try:
+                shardIndex, shards = [int(x) for x in arg[8:].split("/")]
+            except ValueError:
+                help()
+            if not 0 <= shardIndex < shards:
+                help()
+        elif arg.startswith("--output="):
+            outputFile = arg[9:]
+        elif arg == "--merge":
+            merging = True
+        elif arg.startswith("--learn="):
+            label = arg[8:]
+        elif arg.startswith("--learn-words=") or arg.startswith("--learn-weight="):
+            try:
+                if arg.startswith("--learn-words="):
+                    learnSize = int(arg[14:])
+                else:
+                    learnWeight = float(arg[15:])
+            except ValueError:
+                help()
+        elif arg == "--hashed" or arg.startswith("--hashed="):
+            try:
+                bits = int(arg[9:] or defaultBits)
+            except ValueError:
+                help()
+            if bits not in (8, 16):
+                help()
+        elif arg.startswith("--buckets="):
+            try:
+                buckets = int(arg[10:])
+            except ValueError:
+                help()
+            if buckets < 1 or buckets > 1 << 32 or buckets & (buckets - 1):
+                help()
+        else:
+            args.append(arg)
+
+    if merging:
+        if len(args) < 2:
+            help()
+        merge(args[1:], totals is not None)
+        return
+
+    hashed = None if bits is None else (buckets, bits)
+    if compiled is not None:
+        loaded = build_model() if model is None else load_model(model)
+        compile_model(compiled, loaded if hashed is None else hash_model(loaded, *hashed))
+        return
+
+    if repository is not None:
+        classify_history(Classifier(model, hashed=hashed), repository, args[1:] or ["HEAD"], vendored, totals is not None,
+                         cacheDirectory, cacheSize, cacheStats)
+        return
+
+    if (len(args) < 2 and not readStdin):
+        help();
+    if (len(args) > 1 and args[1].startswith("--batch=")):
+        # batch mode
+        if (len(args) > 2):
+            help()
+        with open(args[1][8:]) as f:
+            for line in f:
+                x = line.rstrip("\n").split(",")
+                if (x[0] == ""):
+                    continue
+                if (len(x) == 1):
+                    x.append(os.path.splitext(x[0])[1])
+                input.append((x[0], x[1]))
+    else:
+        i = 1
+        while (i < len(args)):
+            fname = args[i]
+            i += 1
+            if (i < len(args) and args[i].startswith("--ext=")):
+                ext = args[i][6:]
+                i += 1
+            else:
+                ext = os.path.splitext(fname)[1]
+            input.append((fname, ext))
+
+    if label is not None:
+        classifier = Classifier(model)
+        try:
+            for fname, ext in input:
+                classifier.update(fname, label, learnSize, learnWeight)
+        except (ValueError, OSError) as e:
+            print("pangloss: " + str(e), file=sys.stderr)
+            sys.exit(1)
+        classifier.save()
+        print("pangloss: learned %d files as %s, %d words in the model"
+              % (len(input), label, len(classifier.vocabulary)), file=sys.stderr)
+        return
+
+    if stream and margin is None:
+        margin = streamMargin
+    if sample is not None:
+        if sample < 1 or window < 1:
+            help()
+        sample = (sample, window)
+
+    # Archives are read here, one member after the other, after the
+    # other files.
+    import archive
+    archives = [x[0] for x in input if archive.kind(x[0]) is not None and os.path.isfile(x[0])]
+    input = [x for x in input if x[0] not in archives]
+
+    # Each shard keeps its own files, and a scan passes over the others
+    # without opening them.
+    keep = None
+    if shardIndex is not None:
+        keep = lambda path: shard(path, shards) == shardIndex
+
+    # Directories are scanned on all cores unless told otherwise.
+    if any(os.path.isdir(x[0]) for x in input):
+        import scan
+        directories = [x[0] for x in input if os.path.isdir(x[0])]
+        files = [x for x in input if not os.path.isdir(x[0])]
+        input = itertools.chain(files, scan.walk(directories, exclude, vendored=vendored, keep=keep))
+        if not jobsGiven:
+            jobs = os.cpu_count()
+
+    if readStdin:
+        import pipeline
+        input = itertools.chain(input, pipeline.paths(sys.stdin.buffer, separator))
+        if readahead is None:
+            readahead = pipeline.defaultBudget
+
+    # Files given or read from stdin are sharded here, and a resumed
+    # shard skips those it has done.
+    input = ((x, None) if isinstance(x, str) else x for x in input)
+    if keep is not None:
+        input = (x for x in input if keep(x[0]))
+        archives = [x for x in archives if keep(x)]
+    done = set()
+    output = sys.stdout
+    if outputFile is not None:
+        # Regions have no checkpoint format.
+        if regionSize is not None:
+            help()
+        done, output = checkpoint(outputFile)
+        input = (x for x in input if x[0] not in done)
+
+    recorder = None
+    if showStats or traceFile is not None:
+        import stats
+        recorder = stats.Stats(open(traceFile, 'w') if traceFile is not None else None)
+    classifier = Classifier(model, cascade, recorder, hashed)
+    if cascade and not classifier.cascade:
+        print("pangloss: the model has no byte distributions, so --cascade has no effect", file=sys.stderr)
+    if regionSize is not None:
+        print_regions(classifier, input, archives, jobs, ordered, regionSize, archiveDepth)
+        return
+    stages = collections.Counter()
+    resultCache = None
+    if cacheDirectory is not None:
+        import cache
+        resultCache = cache.Cache(classifier.fingerprint(), cacheDirectory or None,
+                                  cacheSize or cache.defaultEntries)
+
+    results = ((fname, result, None) for fname, result in
+               classifier.classify_many(input, jobs, ordered, margin, budget, resultCache, sample, readahead))
+    for path in archives:
+        results = itertools.chain(results, archive_results(classifier, path, archiveDepth, margin, budget, sample))
+    for fname, result, size in results:
+        if fname in done:
+            continue
+        if size is None:
+            size = os.path.getsize(fname) if stream or sample else result.consumed
+        line = fname + "," + result.language + "," + str(result.confidence)
+        if sample is not None:
+            line += "," + str(result.consumed) + "," + str(float(result.consumed) / size if size else 1.0)
+        elif stream:
+            line += "," + str(result.consumed)
+        if output is not sys.stdout:
+            line += "," + str(size)
+        print(line, file=output, flush=output is not sys.stdout)
+        stages[result.stage] += 1
+        if totals is not None:
+            totals[result.language] += size
+
+    if output is not sys.stdout:
+        output.close()
+
+    if totals is not None:
+        import scan
+        for line in scan.summary(totals):
+            print(line)
+
+    if classifier.cascade:
+        files = sum(stages.values())
+        print("cascade: %d of %d files (%.1f%%) decided by bytes, %d by words"
+              % (stages["bytes"], files, 100.0 * stages["bytes"] / max(1, files), stages["words"]), file=sys.stderr)
 
-        # New maximum?
-        if val > max:
-            secondMax = max
-            max = val
-            argmax = i
+    if recorder is not None:
+        if recorder.trace is not None:
+            recorder.trace.close()
+        if showStats:
+            for line in recorder.summary():
+                print(line, file=sys.stderr)
 
-    print(fname + "," + classes[argmax] +  "," + str(1 - (max / secondMax)))
+    if resultCache is not None:
+        if cacheStats:
+            print(resultCache.statistics(), file=sys.stderr)
+        resultCache.close()
 
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+
+# panglossd
+# A long-running pangloss server, and a thin client for it.
+#
+# Usage:
+#   panglossd [--socket=PATH | --port=N] [--jobs=N] [--model=FILE]
+#   panglossd --client [--socket=PATH | --port=N] { filename [--ext=XYZ] }
+#
+# The server loads the models once and answers requests on a Unix domain
+# socket or on a localhost TCP port. Requests and responses are JSON
+# objects, one per line:
+#
+#   {"id": 1, "path": "/abs/file.c"}
+#   {"id": 2, "content": "int main() { ... }", "ext": ".c"}
+#   {"id": 3, "content_base64": "aW50IG1haW4o...", "ext": ".c"}
+#
+#   {"id": 1, "language": "C", "confidence": 0.109, "scores": {...}, "consumed": 558}
+#   {"id": 2, "error": "..."}
+#
+# "margin" and "max_bytes" select streaming classification, as with the
+# options of the same names of pangloss.py. Clients may send any number of
+# requests without waiting for answers; responses carry the id of their
+# request and are sent as soon as they are ready, possibly out of order.
+#
+# Small requests are classified right away on the event loop; larger
+# ones go to a pool of worker processes so they do not hold up others.
+
+import os
+import sys
+import json
+import base64
+import socket
+import asyncio
+import tempfile
+import concurrent.futures
+
+defaultSocket = os.path.join(tempfile.gettempdir(), "panglossd-" + str(os.getuid()) + ".sock")
+
+# Requests for at most this many bytes are classified on the event loop.
+inlineLimit = 65536
+
+# Longest request line accepted, in bytes.
+requestLimit = 64 * 1024 * 1024
+
+def help():
+    print("panglossd serves pangloss classifications over a local socket.")
+    print("Usage: panglossd [--socket=PATH | --port=N] [--jobs=N] [--model=FILE]")
+    print("       [--inline-limit=BYTES]")
+    print("       panglossd --client [--socket=PATH | --port=N] { filename [--ext=XYZ] }")
+    print("The default socket is " + defaultSocket)
+    sys.exit(1)
+
+# The classifier used by worker processes.
+_classifier = None
+
+def _init_worker(model):
+    global _classifier
+    import pangloss
+    _classifier = pangloss.Classifier(model)
+
+def _classify(classifier, path, content, ext, margin, budget):
+    if path is not None:
+        return classifier.classify_path(path, ext, margin, budget)
+    return classifier.classify_bytes(content, ext, margin, budget)
+
+def _classify_in_worker(*args):
+    return _classify(_classifier, *args)
+
+class Server(object):
+    """Answers classification requests with one shared Classifier."""
+
+    def __init__(self, model=None, jobs=0, inlineLimit=inlineLimit):
+        import pangloss
+        self.classifier = pangloss.Classifier(model)
+        self.inlineLimit = inlineLimit
+        self.jobs = jobs or os.cpu_count()
+        self.pool = self.new_pool()
+
+    def new_pool(self):
+        """Return a new pool of worker processes."""
+        return concurrent.futures.ProcessPoolExecutor(self.jobs, initializer=_init_worker,
+                                                      initargs=(self.classifier.model,))
+
+    async def classify(self, request):
+        """Return the Result for one decoded request."""
+        ext = request.get("ext")
+        margin = request.get("margin")
+        budget = request.get("max_bytes")
+        path = request.get("path")
+        content = None
+        if path is not None:
+            if ext is None:
+                ext = os.path.splitext(path)[1]
+            size = os.stat(path).st_size
+        else:
+            if "content" in request:
+                content = request["content"].encode()
+            elif "content_base64" in request:
+                content = base64.b64decode(request["content_base64"])
+            else:
+                raise ValueError("request has no path, content or content_base64")
+            size = len(content)
+        ext = ext or ""
+        if budget is not None:
+            size = min(size, budget)
+
+        if size <= self.inlineLimit:
+            return _classify(self.classifier, path, content, ext, margin, budget)
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        try:
+            return await loop.run_in_executor(pool, _classify_in_worker, path, content, ext, margin, budget)
+        except concurrent.futures.process.BrokenProcessPool:
+            # A worker died (killed for memory, say): start a new pool for
+            # later requests, once for all those that failed with it.
+            if self.pool is pool:
+                self.pool = self.new_pool()
+                pool.shutdown(wait=False)
+            raise
+
+    async def respond(self, line, writer, lock):
+        """Answer the request in line."""
+        id = None
+        try:
+            request = json.loads(line)
+            id = request.get("id")
+            result = await self.classify(request)
+            response = {"id": id,
+                        "language": result.language,
+                        "confidence": result.confidence,
+                        "scores": result.scores,
+                        "consumed": result.consumed}
+        except Exception as e:
+            # Whatever goes wrong, the client waits for an answer.
+            response = {"id": id, "error": str(e) or type(e).__name__}
+        writer.write(json.dumps(response).encode() + b"\n")
+        if writer.transport.get_write_buffer_size() > self.inlineLimit:
+            async with lock:
+                await writer.drain()
+
+    async def handle(self, reader, writer):
+        """Serve one connection until the client closes it."""
+        lock = asyncio.Lock()
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self.respond(line, writer, lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.wait(pending)
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            # The client went away, or sent an overlong line.
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path=None, port=None, host="127.0.0.1"):
+        """Accept connections on the Unix socket path, or on host:port."""
+        if port is not None:
+            server = await asyncio.start_server(self.handle, host, port, limit=requestLimit)
+        else:
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self.handle, path, limit=requestLimit)
+        async with server:
+            await server.serve_forever()
+
+class Client(object):
+    """A blocking connection to a panglossd server."""
+
+    def __init__(self, path=defaultSocket, port=None, host="127.0.0.1"):
+        if port is not None:
+            self.socket = socket.create_connection((host, port))
+        else:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(path)
+        self.file = self.socket.makefile('rwb')
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def request_many(self, requests):
+        """Send all requests at once; return their responses in the same order."""
+        for id, request in enumerate(requests):
+            request = dict(request, id=id)
+            self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        responses = [None] * len(requests)
+        for _ in requests:
+            response = json.loads(self.file.readline())
+            responses[response["id"]] = response
+        return responses
+
+    def classify_path(self, path, ext=None):
+        request = {"path": os.path.abspath(path)}
+        if ext is not None:
+            request["ext"] = ext
+        return self.request_many([request])[0]
+
+    def classify_bytes(self, data, ext=""):
+        return self.request_many([{"content_base64": base64.b64encode(data).decode(), "ext": ext}])[0]
+
+def main(argv):
+    path = defaultSocket
+    port = None
+    jobs = 0
+    model = None
+    limit = inlineLimit
+    client = False
+    args = []
+    for arg in argv[1:]:
+        try:
+            if arg.startswith("--socket="):
+                path = arg[9:]
+            elif arg.startswith("--port="):
+                port = int(arg[7:])
+            elif arg.startswith("--jobs="):
+                jobs = int(arg[7:])
+            elif arg.startswith("--model="):
+                model = arg[8:]
+            elif arg.startswith("--inline-limit="):
+                limit = int(arg[15:])
+            elif arg == "--client":
+                client = True
+            elif arg.startswith("--") and not arg.startswith("--ext="):
+                help()
+            else:
+                args.append(arg)
+        except ValueError:
+            help()
+
+    if not client:
+        if args:
+            help()
+        try:
+            asyncio.run(Server(model, jobs, limit).serve(path, port))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    requests = []
+    i = 0
+    while (i < len(args)):
+        request = {"path": os.path.abspath(args[i])}
+        fname = args[i]
+        i += 1
+        if (i < len(args) and args[i].startswith("--ext=")):
+            request["ext"] = args[i][6:]
+            i += 1
+        requests.append((fname, request))
+    if not requests:
+        help()
+
+    connection = Client(path, port)
+    responses = connection.request_many([request for fname, request in requests])
+    connection.close()
+    for (fname, request), response in zip(requests, responses):
+        if "error" in response:
+            print(fname + ": " + response["error"], file=sys.stderr)
+        else:
+            print(fname + "," + response["language"] + "," + str(response["confidence"]))
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,125 @@
+# Read-ahead for pangloss.
+#
+# prefetch() reads files on a pool of threads while the classifier works
+# on the ones read before, so that the CPU does not sit idle waiting for
+# slow disks or network file systems. The files held in memory at once
+# are bounded by a byte budget. paths() turns a stream of file names,
+# such as the output of find (or find -print0), into a generator that
+# yields them as they arrive.
+
+import os
+import queue
+import threading
+import concurrent.futures
+
+# Threads reading files, and the most files held at once per thread.
+defaultThreads = 8
+filesPerThread = 4
+
+# Most bytes of file contents held at once.
+defaultBudget = 64 << 20
+
+def paths(stream, separator=b"\n"):
+    """Yield the file names in the binary stream, which are ended by separator.
+
+    Directories, which find lists along with the files in them, are
+    skipped.
+    """
+    rest = b""
+    while True:
+        data = stream.read1(65536) if hasattr(stream, "read1") else stream.read(65536)
+        if not data:
+            break
+        names = (rest + data).split(separator)
+        rest = names.pop()
+        for name in names:
+            if name and not os.path.isdir(name):
+                yield os.fsdecode(name)
+    if rest and not os.path.isdir(rest):
+        yield os.fsdecode(rest)
+
+def prefetch(entries, ordered=False, threads=defaultThreads, budget=defaultBudget, limit=None):
+    """Read files ahead on threads, yielding (path, ext, contents) triples.
+
+    entries holds (path, ext) pairs and may be a generator; it is
+    consumed on a thread of its own. Unless ordered, files are yielded as
+    soon as they have been read. At most limit bytes of each file are
+    read, if given.
+
+    The contents of a file count against budget from the time its
+    reading starts until the next file is asked for. Files larger than
+    budget, and files that cannot be read, are not read at all: they are
+    yielded with contents None, for the caller to read (or fail to read)
+    in its own way.
+    """
+    condition = threading.Condition()
+    held = [0, 0]  # bytes and files
+    found = queue.Queue()
+    stopped = threading.Event()
+    done = object()
+    pool = concurrent.futures.ThreadPoolExecutor(threads)
+
+    def read(path, ext, size):
+        if size is None:
+            return path, ext, None, 0
+        try:
+            with open(path, 'rb') as f:
+                return path, ext, f.read(size), size
+        except OSError:
+            return path, ext, None, size
+
+    def reserve(size):
+        with condition:
+            while held[1] and (held[0] + size > budget or held[1] >= threads * filesPerThread) \
+                  and not stopped.is_set():
+                condition.wait()
+            held[0] += size
+            held[1] += 1
+
+    def release(size):
+        with condition:
+            held[0] -= size
+            held[1] -= 1
+            condition.notify()
+
+    def feed():
+        try:
+            for path, ext in entries:
+                if stopped.is_set():
+                    break
+                try:
+                    size = os.path.getsize(path)
+                    if limit is not None:
+                        size = min(size, limit)
+                    if size > budget:
+                        size = None
+                except OSError:
+                    size = None
+                reserve(size or 0)
+                try:
+                    future = pool.submit(read, path, ext, size)
+                except RuntimeError:
+                    # The consumer has gone away and shut the pool down.
+                    break
+                if ordered:
+                    found.put(future)
+                else:
+                    future.add_done_callback(found.put)
+            pool.shutdown(wait=True)
+        finally:
+            found.put(done)
+
+    threading.Thread(target=feed, daemon=True).start()
+    try:
+        while True:
+            future = found.get()
+            if future is done:
+                break
+            path, ext, contents, size = future.result()
+            yield path, ext, contents
+            release(size)
+    finally:
+        stopped.set()
+        with condition:
+            condition.notify_all()
+        pool.shutdown(wait=False)
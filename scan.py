@@ -0,0 +1,198 @@
+# Directory scanning for pangloss.
+#
+# walk() traverses directory trees on a pool of threads, each directory
+# being read exactly once with os.scandir. It honors .gitignore files and
+# extra exclude patterns, and skips vendored and binary files, yielding
+# the remaining files as soon as they are found so that classification
+# can start while the traversal is still going on.
+
+import os
+import re
+import queue
+import threading
+import concurrent.futures
+
+# Version control data, never scanned.
+controlDirectories = set([".git", ".hg", ".svn", ".bzr", "CVS"])
+controlFiles = set([".gitignore", ".gitattributes", ".gitmodules", ".hgignore"])
+
+# Directories that hold other people's code or build output.
+vendoredDirectories = set(["node_modules", "bower_components", "vendor", "third_party", "thirdparty",
+                           "3rdparty", "external", "Godeps", "Pods", "Carthage",
+                           "__pycache__", ".tox", ".venv"])
+
+# Files that are copies of well-known libraries or generated by tools.
+vendoredFiles = re.compile(r"(\.min\.(js|css)|-min\.js|\.pb\.(go|cc|h)|_pb2\.py)$"
+                           r"|^(jquery|bootstrap|d3|angular|react|modernizr)([-.][-.\w]*)?\.js$")
+
+# A file is taken to be binary if its first bytes contain a NUL, as git does.
+sniffSize = 8000
+
+def translate(pattern):
+    """Translate a gitignore glob (without the '!' or trailing '/') to a regex."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    i = 0
+    out = []
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            if j < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile(("" if anchored else "(?:.*/)?") + "".join(out) + r"\Z")
+
+def rules(lines, base):
+    """Parse gitignore lines into rules that apply below the directory base.
+
+    A rule is a (base, regex, negated, directories only) tuple, where
+    base ends with a separator.
+    """
+    base = os.path.join(base, "")
+    parsed = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        directoryOnly = line.endswith("/")
+        line = line.rstrip("/")
+        if line:
+            parsed.append((base, translate(line), negated, directoryOnly))
+    return parsed
+
+def ignored(ruleset, path, isdir):
+    """Tell whether the last rule in ruleset that matches path excludes it."""
+    result = False
+    for base, regex, negated, directoryOnly in ruleset:
+        if directoryOnly and not isdir:
+            continue
+        if regex.match(path[len(base):].replace(os.sep, "/")):
+            result = not negated
+    return result
+
+def binary(path):
+    """Tell whether the file at path looks binary (or cannot be read)."""
+    try:
+        with open(path, 'rb') as f:
+            return b"\0" in f.read(sniffSize)
+    except OSError:
+        return True
+
+def walk(roots, exclude=(), threads=16, vendored=False, keep=None):
+    """Yield the paths of the text files below the directories in roots.
+
+    exclude holds extra gitignore-style patterns, relative to each root.
+    Unless vendored is true, vendored directories and files are skipped.
+    keep, if given, is called with the path of each file found, and the
+    files it rejects are skipped before they are looked at any further,
+    so they are never opened. Paths are yielded in no particular order,
+    as they are found.
+    """
+    found = queue.Queue()
+    lock = threading.Lock()
+    outstanding = [0]
+    stopped = threading.Event()
+    done = object()
+    pool = concurrent.futures.ThreadPoolExecutor(threads)
+
+    def submit(directory, ruleset):
+        with lock:
+            outstanding[0] += 1
+        pool.submit(visit, directory, ruleset)
+
+    def finished():
+        with lock:
+            outstanding[0] -= 1
+            if outstanding[0] == 0:
+                found.put(done)
+
+    def visit(directory, ruleset):
+        try:
+            if stopped.is_set():
+                return
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                return
+            for entry in entries:
+                if entry.name == ".gitignore" and entry.is_file():
+                    try:
+                        with open(entry.path) as f:
+                            ruleset = ruleset + rules(f, directory)
+                    except (OSError, UnicodeDecodeError):
+                        pass
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in controlDirectories and \
+                           (vendored or entry.name not in vendoredDirectories) and \
+                           not ignored(ruleset, entry.path, True):
+                            submit(entry.path, ruleset)
+                    elif entry.is_file(follow_symlinks=False):
+                        if entry.name not in controlFiles and \
+                           (vendored or not vendoredFiles.search(entry.name)) and \
+                           (keep is None or keep(entry.path)) and \
+                           entry.stat().st_size > 0 and \
+                           not ignored(ruleset, entry.path, False) and \
+                           not binary(entry.path):
+                            found.put(entry.path)
+                except OSError:
+                    pass
+        finally:
+            finished()
+
+    # Count the roots as one outstanding directory until all are submitted.
+    outstanding[0] += 1
+    for root in roots:
+        submit(root, rules(exclude, root))
+    finished()
+    try:
+        while True:
+            path = found.get()
+            if path is done:
+                break
+            yield path
+    finally:
+        stopped.set()
+        pool.shutdown(wait=False)
+
+def summary(totals):
+    """Return lines showing the share of each language in totals (language -> bytes)."""
+    total = sum(totals.values()) or 1
+    width = max([len(language) for language in totals] + [0])
+    lines = []
+    for language in sorted(totals, key=lambda language: (-totals[language], language)):
+        share = 100.0 * totals[language] / total
+        lines.append("%-*s %6.2f%% %12d bytes  %s" % (width, language, share, totals[language],
+                                                      "#" * int(round(share / 2))))
+    return lines
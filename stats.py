@@ -0,0 +1,124 @@
+# Profiling counters for pangloss.
+#
+# A Stats given to a Classifier records, for every file it classifies,
+# the wall and CPU time spent in each phase of the work, the bytes read,
+# the words found and how many of them are in the vocabulary:
+#
+#   load   loading (or building from models.py) the model
+#   read   reading the file
+#   split  splitting it into words
+#   bytes  scoring its byte histogram (--cascade)
+#   count  counting the words found in the vocabulary
+#   score  computing the class scores from the counts
+#
+# Each file's record is a dict, which is written as one JSON line to the
+# trace file and passed to the hook, if given, so that a service can feed
+# its own metrics; totals() and summary() add them up. Without a Stats,
+# the classifier only tests for None at each phase.
+
+import json
+import time
+
+phases = ["load", "read", "split", "bytes", "count", "score"]
+
+class Stats(object):
+    """Times and counts of the work done by one classifier.
+
+    Like the classifier it belongs to, it is not safe for use by several
+    threads at once.
+    """
+
+    def __init__(self, trace=None, hook=None):
+        """Write records to the file object trace and pass them to hook, if given."""
+        self.trace = trace
+        self.hook = hook
+        self.files = 0
+        self.bytes = 0
+        self.words = 0
+        self.known = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.phases = dict((phase, [0.0, 0.0]) for phase in phases)
+        self.current = self.phases
+        self.fileWords = 0
+        self.fileKnown = 0
+
+    def start(self):
+        """Start timing a phase."""
+        self.phaseWall = time.perf_counter()
+        self.phaseCpu = time.process_time()
+
+    def stop(self, phase):
+        """Charge the time since start() to phase."""
+        times = self.current[phase]
+        times[0] += time.perf_counter() - self.phaseWall
+        times[1] += time.process_time() - self.phaseCpu
+
+    def counted(self, words, unknown):
+        """Note that words words were counted, unknown of them outside the vocabulary."""
+        self.fileWords += words
+        self.fileKnown += words - unknown
+
+    def begin(self):
+        """Start recording a file."""
+        self.current = dict((phase, [0.0, 0.0]) for phase in phases)
+        self.fileWords = 0
+        self.fileKnown = 0
+        self.fileWall = time.perf_counter()
+        self.fileCpu = time.process_time()
+
+    def end(self, name, consumed, result=None):
+        """Finish recording the file called name, of which consumed bytes were read."""
+        record = {"file": name,
+                  "language": result and result.language,
+                  "stage": result and result.stage,
+                  "bytes": consumed,
+                  "words": self.fileWords,
+                  "known": self.fileKnown,
+                  "wall": time.perf_counter() - self.fileWall,
+                  "cpu": time.process_time() - self.fileCpu,
+                  "phases": dict((phase, times) for phase, times in self.current.items() if times[0])}
+        self.current = self.phases
+        self.add(record)
+
+    def add(self, record):
+        """Count a file's record, such as one made by another process."""
+        self.files += 1
+        self.bytes += record["bytes"]
+        self.words += record["words"]
+        self.known += record["known"]
+        self.wall += record["wall"]
+        self.cpu += record["cpu"]
+        for phase, times in record["phases"].items():
+            self.phases[phase][0] += times[0]
+            self.phases[phase][1] += times[1]
+        if self.trace is not None:
+            self.trace.write(json.dumps(record) + "\n")
+        if self.hook is not None:
+            self.hook(record)
+
+    def totals(self):
+        """Return the totals so far, as a dict like a record's."""
+        return {"files": self.files,
+                "bytes": self.bytes,
+                "words": self.words,
+                "known": self.known,
+                "wall": self.wall,
+                "cpu": self.cpu,
+                "phases": dict((phase, list(times)) for phase, times in self.phases.items())}
+
+    def summary(self):
+        """Return lines showing the totals as a table."""
+        lines = ["%-8s %10s %10s %7s" % ("phase", "wall s", "cpu s", "wall %")]
+        for phase in phases:
+            wall, cpu = self.phases[phase]
+            line = "%-8s %10.3f %10.3f" % (phase, wall, cpu)
+            # Loading happens once, outside of the files.
+            if phase != "load":
+                line += " %6.1f%%" % (100.0 * wall / self.wall if self.wall else 0.0)
+            lines.append(line)
+        lines.append("%-8s %10.3f %10.3f" % ("files", self.wall, self.cpu))
+        lines.append("%d files, %d bytes (%.2f MB/s), %d words, %.1f%% in the vocabulary"
+                     % (self.files, self.bytes, self.bytes / self.wall / 1e6 if self.wall else 0.0,
+                        self.words, 100.0 * self.known / self.words if self.words else 0.0))
+        return lines
@@ -1,48 +1,286 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 
+# testme
+# Accuracy and performance benchmark for pangloss.
+#
+# Usage:
+#   testme.py [--model=FILE] [--repeat=N] [--max-size=BYTES]
+#             [--json=FILE] [--compare=FILE] [--tolerance=FRACTION]
+#
+# Everything runs in this one process, except for the startup time, which
+# is measured by starting a fresh interpreter that loads a Classifier,
+# and the sharding check below, which runs pangloss.py.
+# Reports the accuracy on the test/ corpus per language with a confusion
+# matrix, files/s, MB/s and per-file latency over that corpus, throughput
+# on synthetic inputs from 1 KB to 100 MB, peak RSS and startup time.
+# It also checks that classifying test/ in shards (--shard), by scanning
+# it and from stdin, covers each file exactly once, and fails if not.
+#
+# --json writes the results so that two revisions can be compared:
+# --compare=FILE flags every metric that is worse than in FILE by more
+# than --tolerance (10% by default), and any lost accuracy, and then
+# exits with status 1.
+
+import os
+import sys
+import json
+import time
+import resource
 import subprocess
 
-tests = [("./pangloss.py test/csrankings.js", "JavaScript"),
-         ("./pangloss.py test/csrankings.ts", "TypeScript"),
-         ("./pangloss.py test/csrankings.py", "Python"),
-         ("./pangloss.py test/libhoard.cpp", "C++"),
-         ("./pangloss.py test/hoardmanager.h", "C++"),
-         ("./pangloss.py test/Scheduler.scala", "Scala"),
-         ("./pangloss.py test/student_eval.cgi", "Perl"),
-         ("./pangloss.py test/ProxyUriUtils.java", "Java"),
-         ("./pangloss.py test/jquery-3.1.0.js", "JavaScript"),
-         ("./pangloss.py test/divbyzero.c", "C"),
-         ("./pangloss.py test/divbyzero.cpp", "C++"),
-         ("./pangloss.py test/divbyzero.js", "JavaScript"),
-         ("./pangloss.py test/divbyzero.py", "Python"),
-         ("./pangloss.py test/divbyzero.pl", "Perl"),
-         ("./pangloss.py test/divbyzero.rb", "Ruby"),
-         ("./pangloss.py test/divbyzero.scala", "Scala"),
-         ("./pangloss.py test/divbyzero.java", "Java"),
-         ("./pangloss.py test/hashjoin.java", "Java"),
-         ("./pangloss.py test/paperinfo.php", "PHP"),
-         ("./pangloss.py test/bottles.c", "C"),
-         ("./pangloss.py test/bottles.cpp", "C++"),
-         ("./pangloss.py test/bottles.js", "JavaScript"),
-         ("./pangloss.py test/bottles.php", "PHP"),
-         ("./pangloss.py test/bottles.py", "Python"),
-         ("./pangloss.py test/bottles.pl", "Perl"),
-         ("./pangloss.py test/bottles.rb", "Ruby"),
-         ("./pangloss.py test/bottles.scala", "Scala"),
-         ("./pangloss.py test/bottles.m", "Objective-C"),
-         ("./pangloss.py test/customrr.m", "Objective-C"),
-         ("./pangloss.py test/bottles.java", "Java")]
-
-successes = 0
-failures = 0
-for (cmd, value) in tests:
-    string = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE).stdout.read().strip()
-    if (string != value):
-        failures = failures + 1
-        print "Failed : " + cmd + " -> " + string + " ( should be " + value + ")"
-    else:
-        successes = successes + 1
-
-passrate = 100.0 * float(successes)/(successes + failures)
-print passrate,
-print "% tests passed (" + str(successes) + "/" + str(successes+failures) + ")."
+import pangloss
+
+tests = [("test/csrankings.js", "JavaScript"),
+         ("test/csrankings.ts", "TypeScript"),
+         ("test/csrankings.py", "Python"),
+         ("test/libhoard.cpp", "C++"),
+         ("test/hoardmanager.h", "C++"),
+         ("test/Scheduler.scala", "Scala"),
+         ("test/student_eval.cgi", "Perl"),
+         ("test/ProxyUriUtils.java", "Java"),
+         ("test/jquery-3.1.0.js", "JavaScript"),
+         ("test/divbyzero.c", "C"),
+         ("test/divbyzero.cpp", "C++"),
+         ("test/divbyzero.js", "JavaScript"),
+         ("test/divbyzero.py", "Python"),
+         ("test/divbyzero.pl", "Perl"),
+         ("test/divbyzero.rb", "Ruby"),
+         ("test/divbyzero.scala", "Scala"),
+         ("test/divbyzero.java", "Java"),
+         ("test/hashjoin.java", "Java"),
+         ("test/paperinfo.php", "PHP"),
+         ("test/bottles.c", "C"),
+         ("test/bottles.cpp", "C++"),
+         ("test/bottles.js", "JavaScript"),
+         ("test/bottles.php", "PHP"),
+         ("test/bottles.py", "Python"),
+         ("test/bottles.pl", "Perl"),
+         ("test/bottles.rb", "Ruby"),
+         ("test/bottles.scala", "Scala"),
+         ("test/bottles.m", "Objective-C"),
+         ("test/customrr.m", "Objective-C"),
+         ("test/bottles.java", "Java")]
+
+# Number of shards the test corpus is split into by --shard.
+shardCount = 4
+
+# Synthetic inputs are made by repeating this file up to each size.
+syntheticSource = ("test/jquery-3.1.0.js", "JavaScript")
+syntheticSizes = [1 << 10, 10 << 10, 100 << 10, 1 << 20, 10 << 20, 100 << 20]
+
+# Metrics compared by --compare, and whether more is better.
+metrics = {"accuracy": True,
+           "files_per_second": True,
+           "mb_per_second": True,
+           "latency_p50_ms": False,
+           "latency_p99_ms": False,
+           "peak_rss_mb": False,
+           "startup_ms": False}
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+def help():
+    print("testme measures the accuracy and speed of pangloss.")
+    print("Usage: testme.py [--model=FILE] [--repeat=N] [--max-size=BYTES]")
+    print("       [--json=FILE] [--compare=FILE] [--tolerance=FRACTION]")
+    sys.exit(1)
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+def startup(model, runs=5):
+    """Return the median time, in seconds, to start Python and load a Classifier."""
+    code = "import pangloss; pangloss.Classifier(%r)" % (model,)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", code], cwd=here)
+        times.append(time.perf_counter() - start)
+    return percentile(times, 50)
+
+def accuracy(classifier):
+    """Classify the test corpus; return (results, confusion matrix)."""
+    results = []
+    confusion = {}
+    for fname, expected in tests:
+        path = os.path.join(here, fname)
+        if not os.path.exists(path):
+            results.append((fname, expected, None))
+            continue
+        found = classifier.classify_path(path).language
+        results.append((fname, expected, found))
+        row = confusion.setdefault(expected, {})
+        row[found] = row.get(found, 0) + 1
+    return results, confusion
+
+def throughput(classifier, repeat):
+    """Classify the test corpus repeat times; return files/s, MB/s and latencies."""
+    paths = [os.path.join(here, fname) for fname, expected in tests]
+    paths = [path for path in paths if os.path.exists(path)]
+    latencies = []
+    size = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            before = time.perf_counter()
+            size += classifier.classify_path(path).consumed
+            latencies.append(time.perf_counter() - before)
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, size / elapsed / 1e6, latencies
+
+def synthetic(classifier, maxSize):
+    """Classify ever larger inputs; return a list of (size, MB/s, correct)."""
+    fname, expected = syntheticSource
+    with open(os.path.join(here, fname), 'rb') as f:
+        source = f.read()
+    ext = os.path.splitext(fname)[1]
+    results = []
+    for size in syntheticSizes:
+        if size > maxSize:
+            break
+        data = (source * (size // len(source) + 1))[:size]
+        start = time.perf_counter()
+        result = classifier.classify_bytes(data, ext)
+        elapsed = time.perf_counter() - start
+        results.append((size, size / elapsed / 1e6, result.language == expected))
+    return results
+
+def sharding(model, shards=shardCount):
+    """Classify test/ in shards, by scanning it and from stdin; return the problems found.
+
+    The shards must hold every file of a whole run exactly once, and,
+    as test/ has many more files than shards, none may be empty.
+    """
+    command = [sys.executable, "pangloss.py"] + (["--model=" + model] if model else [])
+    def names(args, stdin=None):
+        output = subprocess.run(command + args, cwd=here, input=stdin, stdout=subprocess.PIPE, check=True).stdout
+        return [line.rsplit(",", 2)[0] for line in output.decode().splitlines()]
+    files = sorted(names(["test"]))
+    listing = "".join(name + "\n" for name in files).encode()
+    problems = []
+    for how, args, stdin in [("scan", ["test"], None), ("stdin", ["--stdin"], listing)]:
+        parts = [names(["--shard=%d/%d" % (i, shards)] + args, stdin) for i in range(0, shards)]
+        found = sorted(name for part in parts for name in part)
+        if found != files or not all(parts):
+            problems.append("%s: %d shards hold %s files, not each of the %d files once, in all of them"
+                            % (how, shards, "+".join(str(len(part)) for part in parts), len(files)))
+    return problems
+
+def compare(current, previous, tolerance):
+    """Return a description of each metric that got worse than in previous."""
+    regressions = []
+    for name, higherIsBetter in sorted(metrics.items()):
+        if name not in current or name not in previous or not previous[name]:
+            continue
+        change = (current[name] - previous[name]) / float(previous[name])
+        if not higherIsBetter:
+            change = -change
+        limit = 0 if name == "accuracy" else tolerance
+        if change < -limit:
+            regressions.append("%s: %.4g -> %.4g (%+.1f%%)" % (name, previous[name], current[name],
+                                                               100.0 * (current[name] - previous[name]) / previous[name]))
+    return regressions
+
+def main(argv):
+    model = None
+    repeat = 20
+    maxSize = syntheticSizes[-1]
+    output = None
+    baseline = None
+    tolerance = 0.1
+    for arg in argv[1:]:
+        try:
+            if arg.startswith("--model="):
+                model = arg[8:]
+            elif arg.startswith("--repeat="):
+                repeat = int(arg[9:])
+            elif arg.startswith("--max-size="):
+                maxSize = int(arg[11:])
+            elif arg.startswith("--json="):
+                output = arg[7:]
+            elif arg.startswith("--compare="):
+                baseline = arg[10:]
+            elif arg.startswith("--tolerance="):
+                tolerance = float(arg[12:])
+            else:
+                help()
+        except ValueError:
+            help()
+
+    classifier = pangloss.Classifier(model)
+
+    results, confusion = accuracy(classifier)
+    successes = 0
+    failures = 0
+    for fname, expected, found in results:
+        if found is None:
+            print("Missing : " + fname)
+        elif found != expected:
+            failures = failures + 1
+            print("Failed : " + fname + " -> " + found + " ( should be " + expected + ")")
+        else:
+            successes = successes + 1
+    passrate = 100.0 * float(successes) / max(1, successes + failures)
+    print("%g %% tests passed (%d/%d)." % (passrate, successes, successes + failures))
+
+    print("")
+    print("Per language (rows: expected, numbered columns: found):")
+    languages = sorted(set(confusion) | set(language for row in confusion.values() for language in row))
+    width = max(len(language) for language in languages)
+    print(" " * (width + 13) + "".join("%4d" % (i + 1) for i in range(len(languages))))
+    for i, language in enumerate(languages):
+        row = confusion.get(language, {})
+        correct = row.get(language, 0)
+        total = sum(row.values())
+        print("%2d %-*s %3d/%-3d  " % (i + 1, width, language, correct, total) +
+              "".join("%4s" % (row.get(column) or ".") for column in languages))
+
+    shardProblems = sharding(model)
+    for problem in shardProblems:
+        print("Failed : sharding " + problem)
+
+    filesPerSecond, mbPerSecond, latencies = throughput(classifier, repeat)
+    scaled = synthetic(classifier, maxSize)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    startupTime = startup(model)
+
+    current = {"version": classifier.version,
+               "accuracy": passrate / 100.0,
+               "per_language": dict((language, float(row.get(language, 0)) / sum(row.values()))
+                                    for language, row in confusion.items()),
+               "confusion": confusion,
+               "files_per_second": filesPerSecond,
+               "mb_per_second": mbPerSecond,
+               "latency_p50_ms": percentile(latencies, 50) * 1e3,
+               "latency_p99_ms": percentile(latencies, 99) * 1e3,
+               "synthetic": [{"bytes": size, "mb_per_second": rate, "correct": correct}
+                             for size, rate, correct in scaled],
+               "peak_rss_mb": peak,
+               "startup_ms": startupTime * 1e3}
+
+    print("")
+    print("Test corpus x%d: %.1f files/s, %.2f MB/s, latency p50 %.3f ms, p99 %.3f ms"
+          % (repeat, filesPerSecond, mbPerSecond, current["latency_p50_ms"], current["latency_p99_ms"]))
+    for size, rate, correct in scaled:
+        print("Synthetic %10d bytes: %8.2f MB/s%s" % (size, rate, "" if correct else " (misclassified)"))
+    print("Peak RSS %.1f MB, startup %.1f ms" % (peak, current["startup_ms"]))
+
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        with open(baseline) as f:
+            regressions = compare(current, json.load(f), tolerance)
+        print("")
+        for regression in regressions:
+            print("Regression : " + regression)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against " + baseline)
+    if shardProblems:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv)
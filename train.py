@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+# train
+# Builds pangloss models from corpora of programs.
+#
+# Usage:
+#   train.py [--words=N] [--jobs=N] [--output=FILE] [--only]
+#            [--extensions=LANGUAGE=.x,.y] { LANGUAGE=SOURCE[,SOURCE...] }
+#
+# Each SOURCE is a directory of programs (only files with the language's
+# extensions are read), a file, or a gzipped file, such as those in
+# train/:
+#
+#   ./train.py Perl=train/perl-modules.txt.gz Ruby=train/ruby-files.txt.gz \
+#              TypeScript=train/typescript-files.txt.gz
+#
+# Words are counted by a pool of processes: the main process cuts the
+# sources into blocks (or batches of files), the workers count the words
+# of each, and the main process merges the counts. If a language has
+# more than --max-distinct distinct words, only the most frequent half
+# is kept, so memory stays bounded; counts of rare words may then be
+# slightly low, which does not affect the top --words words that make up
+# the model unless the corpus is very flat.
+#
+# The histogram of the bytes of each language is counted along with its
+# words; the model only keeps these if it has them for every language
+# (for pangloss --cascade), which takes retraining all of them or --only.
+#
+# Languages of models.py that are not retrained keep their counts there,
+# unless --only is given. The model is written in compiled form (to
+# pangloss.model by default) with a version made of the date and a digest
+# of the counts.
+
+import os
+import sys
+import gzip
+import time
+import hashlib
+import collections
+import multiprocessing
+
+import numpy
+
+import pangloss
+
+# Number of words of each language in the model.
+defaultWords = 100
+
+# Distinct words kept per language while counting.
+defaultDistinct = 2000000
+
+# Sources are handed to workers in blocks of about this many bytes, or in
+# batches of this many files.
+blockSize = 4 << 20
+batchSize = 64
+
+def help():
+    print("train builds a pangloss model from corpora of programs.")
+    print("Usage: train.py [--words=N] [--jobs=N] [--output=FILE] [--only]")
+    print("       [--max-distinct=N] [--extensions=LANGUAGE=.x,.y] { LANGUAGE=SOURCE[,SOURCE...] }")
+    print("       Each SOURCE is a directory, a file, or a gzipped file")
+    sys.exit(1)
+
+def blocks(fileobj, size=blockSize):
+    """Yield the contents of fileobj in blocks that end between words."""
+    rest = b""
+    while True:
+        data = fileobj.read(size)
+        if not data:
+            break
+        data = rest + data
+        cut = max(data.rfind(c) for c in (b"\n", b" ", b"\t", b"\r", b"\x0b", b"\x0c"))
+        if cut < 0:
+            rest = data
+            continue
+        rest = data[cut:]
+        yield data[:cut]
+    if rest:
+        yield rest
+
+def tasks(language, source, extensions):
+    """Yield the counting tasks for one source of a language."""
+    if os.path.isdir(source):
+        import scan
+        batch = []
+        for path in scan.walk([source], vendored=True):
+            if extensions and os.path.splitext(path)[1] not in extensions:
+                continue
+            batch.append(path)
+            if len(batch) == batchSize:
+                yield language, None, batch
+                batch = []
+        if batch:
+            yield language, None, batch
+        return
+    opener = gzip.open if source.endswith(".gz") else open
+    with opener(source, 'rb') as f:
+        for block in blocks(f):
+            yield language, block, None
+
+def count(task):
+    """Count the words and the byte values of one block or batch of files."""
+    language, block, paths = task
+    counts = collections.Counter()
+    histogram = numpy.zeros(256, dtype=numpy.int64)
+    if block is not None:
+        counts.update(block.split())
+        histogram += numpy.bincount(numpy.frombuffer(block, dtype=numpy.uint8), minlength=256)
+    for path in paths or ():
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        counts.update(data.split())
+        histogram += numpy.bincount(numpy.frombuffer(data, dtype=numpy.uint8), minlength=256)
+    return language, counts, histogram
+
+def train(sources, extensions, words=defaultWords, jobs=0, maxDistinct=defaultDistinct):
+    """Count the words and bytes of each language's sources.
+
+    sources maps each language to a list of sources, and extensions maps
+    languages to their extension lists. Returns language -> Counter of
+    words and language -> histogram of byte values.
+    """
+    counts = dict((language, collections.Counter()) for language in sources)
+    histograms = dict((language, numpy.zeros(256, dtype=numpy.int64)) for language in sources)
+    work = (task for language in sources for source in sources[language]
+            for task in tasks(language, source, extensions.get(language)))
+    with multiprocessing.Pool(jobs or os.cpu_count()) as pool:
+        for language, partial, histogram in pool.imap_unordered(count, work):
+            histograms[language] += histogram
+            total = counts[language]
+            total.update(partial)
+            if len(total) > maxDistinct:
+                counts[language] = collections.Counter(dict(total.most_common(maxDistinct // 2)))
+    return counts, histograms
+
+def main(argv):
+    words = defaultWords
+    jobs = 0
+    output = pangloss.defaultModel
+    only = False
+    maxDistinct = defaultDistinct
+    sources = collections.OrderedDict()
+    newExtensions = {}
+    for arg in argv[1:]:
+        try:
+            if arg.startswith("--words="):
+                words = int(arg[8:])
+            elif arg.startswith("--jobs="):
+                jobs = int(arg[7:])
+            elif arg.startswith("--output="):
+                output = arg[9:]
+            elif arg == "--only":
+                only = True
+            elif arg.startswith("--max-distinct="):
+                maxDistinct = int(arg[15:])
+            elif arg.startswith("--extensions=") and "=" in arg[13:]:
+                language, exts = arg[13:].split("=", 1)
+                newExtensions[language] = exts.split(",")
+            elif "=" in arg and not arg.startswith("--"):
+                language, paths = arg.split("=", 1)
+                sources.setdefault(language, []).extend(paths.split(","))
+            else:
+                help()
+        except ValueError:
+            help()
+    if not sources:
+        help()
+
+    import models
+    classes = [] if only else list(models.classes)
+    extensions = [] if only else [list(x) for x in models.extensions]
+    counts = [] if only else list(models.classifiers)
+    byteCounts = [None] * len(classes)
+    for language in sources:
+        if language not in classes:
+            classes.append(language)
+            extensions.append([])
+            counts.append({})
+            byteCounts.append(None)
+    for language, exts in newExtensions.items():
+        if language in classes:
+            extensions[classes.index(language)] = exts
+
+    start = time.time()
+    trained, histograms = train(sources, dict(zip(classes, extensions)), words, jobs, maxDistinct)
+    digest = hashlib.sha1()
+    for language in trained:
+        top = dict(trained[language].most_common(words))
+        counts[classes.index(language)] = top
+        byteCounts[classes.index(language)] = histograms[language].tolist()
+        print("%s: %d words, %d distinct, top %d kept" % (language, sum(trained[language].values()),
+                                                          len(trained[language]), len(top)), file=sys.stderr)
+    for i in range(0, len(classes)):
+        digest.update(repr((classes[i], extensions[i], sorted(counts[i].items()))).encode())
+
+    version = time.strftime("%Y-%m-%d", time.gmtime()) + "-" + digest.hexdigest()[:12]
+    pangloss.compile_model(output, pangloss.build_model(classes, extensions, counts, version, byteCounts))
+    print("wrote %s (version %s) in %.1f s" % (output, version, time.time() - start), file=sys.stderr)
+
+if __name__ == "__main__":
+    main(sys.argv)